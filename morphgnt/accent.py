@@ -0,0 +1,166 @@
+"""
+memoized syllabification and accent placement over greek-accentuation.
+
+The persistent accent of a form only depends on its last three syllables,
+on where in them the lemma's accent falls and on which accent that is.
+Accented endings are kept in a bounded LRU table keyed by exactly that, so
+the forms of all lemmas of the same class and shape share them (-ου,
+-οις, -ων after a given penult are accented once, not once per lemma).
+"""
+
+from collections import OrderedDict
+
+import accentuation
+import syllabify as syllabification
+
+
+class LRU(object):
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, compute):
+        """
+        return the value for key, calling compute() on a miss.
+        """
+        try:
+            value = self.data[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self.data[key] = value
+            if len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+            return value
+        self.hits += 1
+        self.data.move_to_end(key)
+        return value
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def persistent_tail(tail, place, accent):
+    """
+    return the (up to) three final syllables tail accented with accent on
+    the place-th syllable from the end or, where that is not possible, as
+    close to it as accentuation.persistent would put it.
+    """
+    possible = list(accentuation.possible_accentuations(list(tail)))
+    accent_type = (place, accent)
+    if accent_type not in possible:
+        other = accentuation.ACUTE if accent == accentuation.CIRCUMFLEX else accentuation.CIRCUMFLEX
+        for candidate in [
+            (place, other),
+            (place - 1, accentuation.CIRCUMFLEX), (place - 1, accentuation.ACUTE),
+            (place - 2, accentuation.CIRCUMFLEX), (place - 2, accentuation.ACUTE),
+            (place - 3, accentuation.CIRCUMFLEX), (place - 3, accentuation.ACUTE),
+        ]:
+            if candidate in possible:
+                accent_type = candidate
+                break
+        else:
+            accent_type = sorted(possible, reverse=True)[0]
+    return accentuation.add_accent(list(tail), accent_type)
+
+
+class AccentCache(object):
+
+    def __init__(self, maxsize=65536):
+        self.syllables = LRU(maxsize)
+        self.constraints = LRU(maxsize)
+        self.accented = LRU(maxsize)
+
+    def syllabify(self, word):
+        return self.syllables.get(word, lambda: tuple(syllabification.syllabify(word)))
+
+    def constraint(self, lemma):
+        """
+        return (number of syllables, accent type) of lemma, which is all its
+        forms' persistent accent depends on (the accent type is None for an
+        unaccented lemma).
+        """
+        return self.constraints.get(lemma, lambda: (
+            len(self.syllabify(lemma)), accentuation.get_accent_type(lemma)
+        ))
+
+    def persistent(self, form, lemma):
+        """
+        return the unaccented form accented persistently from lemma.
+
+        Raises ValueError if lemma has no accent to persist.
+        """
+        lemma_length, accent_type = self.constraint(lemma)
+        if accent_type is None:
+            raise ValueError("{} is unaccented".format(lemma))
+        syllables = self.syllabify(form.replace("|", ""))
+        place, accent = accent_type
+        tail = syllables[-3:]
+        key = (tail, "persistent", len(syllables) - lemma_length + place, accent)
+        return "".join(syllables[:-3]) + self.accented.get(
+            key, lambda: persistent_tail(tail, key[2], accent)
+        )
+
+    def recessive(self, form, default_short=False):
+        """
+        return form accented as far back as it can be, its α, ι and υ
+        taken as long unless default_short.
+        """
+        return self.accented.get(
+            (form, "recessive", default_short),
+            lambda: accentuation.recessive(form, default_short=default_short),
+        )
+
+    def perispomenon(self, form):
+        return self.accented.get((form, "perispomenon"), lambda: accentuation.make_perispomenon(form))
+
+    def oxytone(self, form):
+        return self.accented.get((form, "oxytone"), lambda: accentuation.make_oxytone(form))
+
+    def paroxytone(self, form):
+        return self.accented.get((form, "paroxytone"), lambda: accentuation.make_paroxytone(form))
+
+    def persistent_batch(self, pairs):
+        """
+        return persistent(form, lemma) for each (form, lemma) pair, working
+        each distinct (form, accent constraint) out only once.
+        """
+        pairs = list(pairs)
+        results = {}
+        for form, lemma in pairs:
+            key = (form,) + self.constraint(lemma)
+            if key not in results:
+                try:
+                    results[key] = self.persistent(form, lemma)
+                except ValueError:
+                    results[key] = None
+        return [results[(form,) + self.constraint(lemma)] for form, lemma in pairs]
+
+    def stats(self):
+        """
+        return name -> (hits, misses, size) for each table.
+        """
+        return {
+            name: (table.hits, table.misses, len(table.data))
+            for name, table in [
+                ("syllables", self.syllables),
+                ("constraints", self.constraints),
+                ("accented", self.accented),
+            ]
+        }
+
+
+default = AccentCache()
+
+syllabify = default.syllabify
+persistent = default.persistent
+recessive = default.recessive
+perispomenon = default.perispomenon
+oxytone = default.oxytone
+paroxytone = default.paroxytone
+persistent_batch = default.persistent_batch
+stats = default.stats
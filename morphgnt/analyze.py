@@ -0,0 +1,643 @@
+"""
+rule-based morphological analysis.
+
+A surface form is mapped to (lemma, parse) candidates without consulting
+any tagged text, by combining
+
+- suffix lookup: one walk back from the end of the (folded) form finds every
+  nominal ending of nominal_endings.yaml and indicative verb ending of
+  ending-paradigms.txt the form ends with;
+- stem recovery: what is left of the form is turned back into candidate
+  lexical stems, removing augment, reduplication and tense formatives from
+  verbs (also after a preverb);
+- a lexicon stem index: the stems of the lexemes.yaml headwords, derived
+  from the headword and its mounce-morphcat, which also decides which
+  nominal endings a stem takes, plus the tense stems of the principal
+  parts in principal_parts.txt;
+- closed-class tables: the forms of the article and the pronouns, written
+  out from their paradigms as the endings tables can't derive them.
+
+Parses are in the format of the ccat-parse column, e.g. ----GSM- or
+3AAI-S--.
+"""
+
+from collections import defaultdict
+import re
+import unicodedata
+
+from .cache import cached
+from .categories import ADJECTIVE_CATEGORIES
+from .fuzzy import fold
+from .utils import ACUTE, GRAVE, ROUGH, load_yaml, strip_accents, strip_breathing
+
+
+NOMINAL_ENDINGS = "projects/nominal_distinguishers/nominal_endings.yaml"
+VERB_ENDINGS = "projects/principal_parts/ending-paradigms.txt"
+
+PERSON_NUMBERS = ["1S", "2S", "3S", "1P", "2P", "3P"]
+
+PRINCIPAL_PARTS = "projects/principal_parts/principal_parts.txt"
+
+UNINFLECTED = "--------"
+UNINFLECTED_POS = {"C", "D", "P", "X", "I"}
+
+# elided forms take the aspirated consonant before a rough breathing
+ASPIRATED = {"π": "φ", "τ": "θ", "κ": "χ"}
+
+# bumped whenever what an Analyzer indexes changes, to discard cached ones
+VERSION = 2
+
+
+# the noun classes each gender of an adjective declines like, for the
+# adjective classes of lexemes.yaml (and the subclass morphgnt.paradigms
+# puts some of them in)
+
+ADJECTIVE_CLASSES = {
+    cat: ADJECTIVE_CATEGORIES[cat] for cat in [
+        "a-1a(1)", "a-1a(2a)", "a-1b", "a=1b(ALPHA-F)", "a-2a", "a-2b", "a-3a",
+        "a-3b(1)", "a-3b(2)", "a-4a", "a-4b(1)",
+    ]
+}
+
+
+# present stems of verbs by the ending of the (folded) lemma; contract and
+# -μι stems are also indexed without their final vowel, which the
+# contracted endings absorb
+
+VERB_LEMMA_ENDINGS = ["ομαι", "μαι", "μι", "ω"]
+
+VOWELS = "αεηιουω"
+
+
+# stem recovery: (suffix of the stem left by the ending, replacement) pairs
+# undoing the tense formative, by tense_voice (or just tense)
+
+SIGMATIC = [
+    ("σ", ""), ("ησ", "ε"), ("ησ", "α"), ("ωσ", "ο"), ("σ", "ζ"),
+    ("ξ", "κ"), ("ξ", "γ"), ("ξ", "χ"), ("ξ", "σσ"),
+    ("ψ", "π"), ("ψ", "β"), ("ψ", "φ"),
+]
+
+PASSIVE = [
+    ("", ""), ("η", "ε"), ("η", "α"), ("ω", "ο"), ("σ", ""), ("σ", "ζ"),
+    ("χ", "κ"), ("χ", "γ"), ("φ", "π"), ("φ", "β"),
+]
+
+FORMATIVES = {
+    "P": [("", "")],
+    "I": [("", "")],
+    "F": SIGMATIC + [("", "")],
+    "FP": [(s + "θησ", r) for s, r in PASSIVE] + [("ησ", "")],
+    "A": SIGMATIC + [("", "")],
+    "AP": PASSIVE + [(s + "θ", r) for s, r in PASSIVE],
+    "X": [("κ", ""), ("ηκ", "ε"), ("ηκ", "α"), ("ωκ", "ο"), ("", "")],
+    "Y": [("κ", ""), ("ηκ", "ε"), ("ηκ", "α"), ("ωκ", "ο"), ("", "")],
+}
+
+AUGMENTED = {"I", "A", "Y"}
+REDUPLICATED = {"X", "Y"}
+
+# temporal augments: augmented initial -> unaugmented initials
+TEMPORAL = {"η": ["α", "ε"], "ω": ["ο"], "ῃ": ["αι"], "ῳ": ["οι"]}
+
+
+# preverbs as they appear before an augment or reduplication, with the form
+# they take in the lemma before a consonant
+
+PREVERBS = [
+    ("αμφ", "αμφι"), ("αν", "ανα"), ("αντ", "αντι"), ("απ", "απο"),
+    ("αφ", "απο"), ("δι", "δια"), ("εισ", "εισ"), ("εξ", "εκ"),
+    ("εν", "εν"), ("επ", "επι"), ("εφ", "επι"), ("κατ", "κατα"),
+    ("καθ", "κατα"), ("μετ", "μετα"), ("μεθ", "μετα"), ("παρ", "παρα"),
+    ("περι", "περι"), ("προ", "προ"), ("προσ", "προσ"), ("συν", "συν"),
+    ("υπερ", "υπερ"), ("υπ", "υπο"), ("υφ", "υπο"),
+]
+
+ASSIMILATION = {
+    "συν": {"λ": "συλ", "β": "συμ", "π": "συμ", "φ": "συμ", "μ": "συμ", "ψ": "συμ",
+            "κ": "συγ", "γ": "συγ", "χ": "συγ", "ξ": "συγ", "σ": "συ", "ζ": "συ"},
+    "εν": {"λ": "ελ", "β": "εμ", "π": "εμ", "φ": "εμ", "μ": "εμ", "ψ": "εμ",
+           "κ": "εγ", "γ": "εγ", "χ": "εγ", "ξ": "εγ"},
+}
+
+
+# closed classes: the endings of the article and the 2-1-2 pronouns (with
+# the neuter singular in -ο), by case, number and gender
+
+PRONOMINAL = {
+    "NSM": "ος", "GSM": "ου", "DSM": "ῳ", "ASM": "ον",
+    "NSF": "η", "GSF": "ης", "DSF": "ῃ", "ASF": "ην",
+    "NSN": "ο", "GSN": "ου", "DSN": "ῳ", "ASN": "ο",
+    "NPM": "οι", "GPM": "ων", "DPM": "οις", "APM": "ους",
+    "NPF": "αι", "GPF": "ων", "DPF": "αις", "APF": "ας",
+    "NPN": "α", "GPN": "ων", "DPN": "οις", "APN": "α",
+}
+
+OBLIQUE = [cell for cell in PRONOMINAL if cell[0] != "N"]
+PLURAL_OBLIQUE = [cell for cell in OBLIQUE if cell[1] == "P"]
+
+
+def tis(stem):
+    """
+    return cell -> forms of τίς (stem τί) or τις (stem τι), whose
+    masculine and feminine are the same.
+    """
+    table = {}
+    for case, singular, plural in [("N", "ς", "νες"), ("G", "νος", "νων"), ("D", "νι", "σι(ν)"), ("A", "να", "νας")]:
+        for gender in "MF":
+            table[case + "S" + gender] = [stem + singular]
+            table[case + "P" + gender] = [stem + plural]
+        table[case + "SN"] = [stem] if case in "NA" else [stem + singular]
+        table[case + "PN"] = [stem + "να"] if case in "NA" else [stem + plural]
+    return table
+
+
+def grave(form):
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFD", form).replace(ACUTE, GRAVE))
+
+
+def rough(form):
+    """
+    return form with a rough breathing on its initial vowel (or diphthong).
+    """
+    i = 1 if form[1:2] in ("ι", "υ") and form[0] in "αεου" else 0
+    return unicodedata.normalize("NFC", form[:i + 1] + ROUGH + form[i + 1:])
+
+
+def pronominal(stem, cells=PRONOMINAL, **forms):
+    """
+    return cell -> forms of a 2-1-2 pronoun, for the given cells, with
+    forms (given by cell) replacing the regular ones.
+    """
+    table = {cell: [stem + PRONOMINAL[cell]] for cell in cells}
+    for cell, form in forms.items():
+        table[cell] = form if isinstance(form, list) else [form]
+    return table
+
+
+def demonstrative(prefix):
+    """
+    return cell -> forms of οὗτος (prefix τ) or one of its compounds: -αυτ-
+    where the ending has η or α, -ουτ- elsewhere.
+    """
+    table = {}
+    for cell, ending in PRONOMINAL.items():
+        stem = "αυτ" if ending[0] in "ηα" else "ουτ"
+        table[cell] = [prefix + stem + ending]
+    if prefix == "τ":
+        for cell in ["NSM", "NSF", "NPM", "NPF"]:
+            table[cell] = [rough(table[cell][0][1:])]
+    else:
+        table["NSN"].append(table["NSN"][0] + "ν")
+    return table
+
+
+def personal(nominative, genitive, dative, accusative, plural=()):
+    """
+    return cell -> forms of a personal pronoun, which has no gender.
+    """
+    table = {}
+    for number, forms in [("S", [nominative, genitive, dative, accusative]), ("P", plural)]:
+        for case, form in zip("NGDA", forms):
+            table[case + number + "-"] = form if isinstance(form, list) else [form]
+    return table
+
+
+ARTICLE = pronominal("τ", NSM="ὁ", NSF="ἡ", NPM="οἱ", NPF="αἱ")
+
+RELATIVE = {
+    "NSM": "ὅς", "GSM": "οὗ", "DSM": "ᾧ", "ASM": "ὅν",
+    "NSF": "ἥ", "GSF": "ἧς", "DSF": "ᾗ", "ASF": "ἥν",
+    "NSN": "ὅ", "GSN": "οὗ", "DSN": "ᾧ", "ASN": "ὅ",
+    "NPM": "οἵ", "GPM": "ὧν", "DPM": "οἷς", "APM": "οὕς",
+    "NPF": "αἵ", "GPF": "ὧν", "DPF": "αἷς", "APF": "ἅς",
+    "NPN": "ἅ", "GPN": "ὧν", "DPN": "οἷς", "APN": "ἅ",
+}
+RELATIVE = {cell: sorted({form, grave(form)}) for cell, form in RELATIVE.items()}
+
+# lemma -> cell -> forms. The accents written matter: a form spelt exactly
+# so is taken first, then one differing only in accents and then one
+# differing in breathing too, which tells the article ὁ from the relative ὃ,
+# ἡ from ἤ and the interrogative τίς from τὶς and τινός. Forms that tie are
+# ranked in this order (and then in the order of their cells).
+
+CLOSED_CLASSES = {
+    "ὁ": ARTICLE,
+    "αὐτός": pronominal("αὐτ"),
+    "ἐγώ": personal("ἐγώ", ["ἐμοῦ", "μου"], ["ἐμοί", "μοι"], ["ἐμέ", "με"],
+                    ["ἡμεῖς", "ἡμῶν", "ἡμῖν", "ἡμᾶς"]),
+    "σύ": personal("σύ", "σοῦ", "σοί", "σέ", ["ὑμεῖς", "ὑμῶν", "ὑμῖν", "ὑμᾶς"]),
+    "ὅς": RELATIVE,
+    "οὗτος": demonstrative("τ"),
+    "τις": tis("τι"),
+    "τίς": tis("τί"),
+    "ἑαυτοῦ": {cell: [stem + PRONOMINAL[cell] for stem in ["ἑαυτ", "αὑτ"]] for cell in OBLIQUE},
+    "ἐκεῖνος": pronominal("ἐκειν"),
+    # the neuter ὅ τι is written as two words
+    "ὅστις": {
+        cell: [RELATIVE[cell][-1].replace("ς", "σ") + form] + (["ὅτου"] if cell in ["GSM", "GSN"] else [])
+        for cell, [form] in tis("τι").items() if cell not in ["NSN", "ASN"]
+    },
+    "ἀλλήλων": pronominal("ἀλλήλ", PLURAL_OBLIQUE),
+    "κἀγώ": personal("κἀγώ", "κἀμοῦ", "κἀμοί", "κἀμέ"),
+    "τοιοῦτος": demonstrative("τοι"),
+    "σεαυτοῦ": pronominal("σεαυτ", OBLIQUE),
+    "ἐμαυτοῦ": pronominal("ἐμαυτ", OBLIQUE),
+    "κἀκεῖνος": pronominal("κἀκειν"),
+    "τοσοῦτος": demonstrative("τοσ"),
+    "ὅδε": {cell: [form + "δε" for form in forms] for cell, forms in ARTICLE.items()},
+    "τηλικοῦτος": demonstrative("τηλικ"),
+}
+
+
+def parse_nominal_endings(filename):
+    """
+    yield (cell, ending, theme ending, class regex, explanation) for each
+    entry of nominal_endings.yaml, where the theme ending is the part of the
+    ending after any "." and so the part removed to leave the theme.
+    """
+    for cell, entries in load_yaml(filename).items():
+        for entry in entries or []:
+            try:
+                ending, class_regex, explanation = entry.split()
+            except ValueError:
+                continue
+            ending = fold(ending)
+            yield cell, ending.replace(".", ""), ending[ending.find(".") + 1:], class_regex, explanation
+
+
+def parse_verb_endings(filename):
+    """
+    yield (tense_voice, person_number, ending) for each ending of
+    ending-paradigms.txt, with a movable ν both with and without it.
+    """
+    with open(filename) as f:
+        for line in f:
+            line = line.split("#")[0].strip()
+            if not line:
+                continue
+            tense_voice, rest = line.split(":")
+            for person_number, ending in zip(PERSON_NUMBERS, rest.split(",")):
+                for alternative in ending.strip().split("/"):
+                    if alternative in ["", "?"]:
+                        continue
+                    alternative = fold(alternative)
+                    if alternative.endswith("(ν)"):
+                        yield tense_voice, person_number, alternative[:-3]
+                        yield tense_voice, person_number, alternative[:-3] + "ν"
+                    else:
+                        yield tense_voice, person_number, alternative
+
+
+def parse_principal_parts(filename):
+    """
+    yield (lemma, tense_voice, first singular form) for each form in
+    principal_parts.txt that is known in full.
+    """
+    with open(filename) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            lemma, tense_voice, forms = line.split()
+            for form in forms.split("|"):
+                form = form.split("/")[0]
+                if "?" not in form:
+                    yield lemma, tense_voice, fold(form)
+
+
+def variants(word):
+    """
+    yield word with any optional letters in parentheses, e.g. μέχρι(ς),
+    both left out and put in.
+    """
+    if "(" not in word:
+        yield word
+    else:
+        yield re.sub(r"\(.*?\)", "", word)
+        yield word.replace("(", "").replace(")", "")
+
+
+def elisions(word):
+    """
+    yield the forms word takes when its final vowel is elided.
+    """
+    if len(word) > 1 and word[-1] in VOWELS:
+        yield word[:-1] + "’"
+        if word[-2] in ASPIRATED:
+            yield word[:-2] + ASPIRATED[word[-2]] + "’"
+    if word == "εκ":
+        yield "εξ"
+
+
+def morphcats(metadata):
+    value = metadata.get("mounce-morphcat")
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def noun_classes(metadata):
+    """
+    return gender -> the noun classes a nominal lexeme declines like in
+    that gender.
+    """
+    by_gender = defaultdict(set)
+    for cat in morphcats(metadata):
+        if cat in ADJECTIVE_CLASSES:
+            for gender, classes in ADJECTIVE_CLASSES[cat].items():
+                by_gender[gender].update(classes)
+        elif cat.startswith("n"):
+            for gender in "MFN":
+                by_gender[gender].add(cat)
+    return by_gender
+
+
+def citation_endings(nominal_endings):
+    """
+    return (gender, ending, theme ending, compiled class regex) for the
+    nominative singular endings among nominal_endings.
+    """
+    return [
+        (cell[2], ending, theme_ending, re.compile(class_regex))
+        for cell, ending, theme_ending, class_regex, explanation in nominal_endings
+        if cell[:2] == "NS"
+    ]
+
+
+def nominal_themes(folded, metadata, citation):
+    """
+    return the sorted (theme, gender, noun class) of a nominal lexeme whose
+    folded lemma is given.
+
+    The lemma is a nominative singular, so its theme is what is left after
+    an ending that fits it and one of its classes. Nouns only take the
+    genders their citation form has; adjectives take all of theirs.
+    """
+    by_gender = noun_classes(metadata)
+    found = set()
+    for gender, ending, theme_ending, regex in citation:
+        if not folded.endswith(ending):
+            continue
+        for cat in by_gender.get(gender, ()):
+            if regex.match(cat):
+                found.add((folded[:len(folded) - len(theme_ending)], gender, cat))
+    if not found:
+        return []
+    if all(cat.startswith("n") for cat in morphcats(metadata)):
+        return sorted(found)
+    return sorted(
+        (theme, gender, cat)
+        for theme in {theme for theme, gender, cat in found}
+        for gender, cats in by_gender.items() for cat in cats
+    )
+
+
+def unaugment(stem):
+    """
+    yield the stems stem could be with an augment removed.
+    """
+    if len(stem) > 1 and stem[0] == "ε":
+        yield stem[1:]
+    for augmented, initials in TEMPORAL.items():
+        if stem.startswith(augmented):
+            for initial in initials:
+                yield initial + stem[len(augmented):]
+
+
+def unreduplicate(stem):
+    if len(stem) > 2 and stem[1] == "ε" and stem[0] not in VOWELS:
+        yield stem[2:]
+    yield from unaugment(stem)
+
+
+def with_preverb(stem, undo):
+    """
+    yield undo(stem) and, for stems beginning with a preverb, the preverb
+    followed by undo() of the rest.
+    """
+    yield from undo(stem)
+    for surface, base in PREVERBS:
+        if stem.startswith(surface) and len(stem) > len(surface) + 1:
+            for rest in undo(stem[len(surface):]):
+                if rest[0] in VOWELS:
+                    yield surface + rest
+                else:
+                    yield ASSIMILATION.get(base, {}).get(rest[0], base) + rest
+
+
+class Analyzer(object):
+
+    def __init__(self, lexemes, nominal_endings, verb_endings, principal_parts=()):
+        # reversed-ending trie; the None key of a node holds its rules
+        self.suffixes = {}
+        self.rank = 0
+        # theme -> [(lemma, gender, noun class)]
+        self.nominal_stems = defaultdict(list)
+        # present stem -> [lemma]
+        self.verb_stems = defaultdict(list)
+        # (tense_voice, stem of a principal part) -> [lemma]
+        self.tense_stems = defaultdict(list)
+        # folded lemma -> [lemma]
+        self.uninflected = defaultdict(list)
+        # folded form -> [(form, form without accents, rank, lemma, parse)]
+        # of the closed classes
+        self.closed = defaultdict(list)
+
+        nominal_endings = list(nominal_endings)
+        verb_endings = list(verb_endings)
+        self._index_lexemes(lexemes, nominal_endings)
+
+        classes = {cat for entries in self.nominal_stems.values() for lemma, gender, cat in entries}
+        for cell, ending, theme_ending, class_regex, explanation in nominal_endings:
+            regex = re.compile(class_regex)
+            accepted = frozenset(cat for cat in classes if regex.match(cat))
+            if accepted:
+                self._add_rule(ending, ("N", len(theme_ending), cell, accepted))
+        for tense_voice, person_number, ending in verb_endings:
+            self._add_rule(ending, ("V", tense_voice, person_number))
+        self._index_principal_parts(principal_parts, verb_endings)
+
+        self.nominal_stems = dict(self.nominal_stems)
+        self.verb_stems = dict(self.verb_stems)
+        self.tense_stems = dict(self.tense_stems)
+        self.uninflected = dict(self.uninflected)
+        self.closed = dict(self.closed)
+        self.memo = {}
+
+    def _add_rule(self, ending, rule):
+        node = self.suffixes
+        for ch in reversed(ending):
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(rule + (self.rank,))
+        self.rank += 1
+
+    def _index_lexemes(self, lexemes, nominal_endings):
+        citation = citation_endings(nominal_endings)
+        for lemma, metadata in lexemes.items():
+            pos = str(metadata.get("pos", "")).split("/")[0]
+            folded = fold(lemma)
+            if pos in UNINFLECTED_POS:
+                for variant in variants(folded):
+                    for form in [variant] + list(elisions(variant)):
+                        self.uninflected[form].append(lemma)
+            elif lemma in CLOSED_CLASSES:
+                self._index_closed(lemma)
+            elif pos == "V":
+                for ending in VERB_LEMMA_ENDINGS:
+                    if folded.endswith(ending) and len(folded) > len(ending):
+                        stem = folded[:-len(ending)]
+                        self.verb_stems[stem].append(lemma)
+                        if stem[-1] in VOWELS and len(stem) > 1:
+                            self.verb_stems[stem[:-1]].append(lemma)
+                        break
+            elif pos in ["N", "A"] or pos.startswith("R"):
+                # the other pronouns (ὅσος, ποῖος, ...) decline as adjectives
+                self._index_nominal(lemma, folded, metadata, citation)
+
+    def _index_closed(self, lemma):
+        for rank, (cell, forms) in enumerate(CLOSED_CLASSES[lemma].items()):
+            rank = (list(CLOSED_CLASSES).index(lemma), rank)
+            for form in forms:
+                for variant in variants(form):
+                    marked = strip_accents(variant)
+                    entry = (variant, marked, rank, lemma, "----" + cell + "-")
+                    entries = self.closed.setdefault(strip_breathing(marked), [])
+                    if entry not in entries:
+                        entries.append(entry)
+
+    def _index_nominal(self, lemma, folded, metadata, citation):
+        for theme, gender, cat in nominal_themes(folded, metadata, citation):
+            self.nominal_stems[theme].append((lemma, gender, cat))
+
+    def _index_principal_parts(self, principal_parts, verb_endings):
+        first_singular = defaultdict(set)
+        for tense_voice, person_number, ending in verb_endings:
+            if person_number == "1S":
+                first_singular[tense_voice].add(ending)
+        for lemma, tense_voice, form in principal_parts:
+            stems = {
+                form[:len(form) - len(ending)]
+                for ending in first_singular[tense_voice]
+                if form.endswith(ending) and len(form) > len(ending)
+            }
+            for stem in sorted(stems):
+                if lemma not in self.tense_stems[tense_voice, stem]:
+                    self.tense_stems[tense_voice, stem].append(lemma)
+
+    def recover(self, stem, tense_voice):
+        """
+        yield (lexicon stem, cost) for each way stem, left by an ending of
+        the given tense_voice, could come from a present stem.
+        """
+        tense = tense_voice[0]
+        formatives = FORMATIVES.get(tense_voice, FORMATIVES.get(tense, [("", "")]))
+        if tense in REDUPLICATED:
+            undo, cost = unreduplicate, 0
+        elif tense in AUGMENTED:
+            undo, cost = unaugment, 0
+        else:
+            undo, cost = None, 0
+        for suffix, replacement in formatives:
+            if not stem.endswith(suffix) or len(stem) <= len(suffix):
+                continue
+            base = stem[:len(stem) - len(suffix)] + replacement
+            if undo is None:
+                yield base, cost
+                continue
+            for recovered in with_preverb(base, undo):
+                yield recovered, cost
+            # unaugmented forms are possible but unlikely
+            yield base, cost + 1
+
+    def analyze(self, form):
+        """
+        return [(lemma, parse), ...] for form, most likely first.
+        """
+        # the memo keeps accents and breathing, which the closed classes go by
+        key = unicodedata.normalize("NFC", form.lower())
+        if key in self.memo:
+            return self.memo[key]
+        marked = strip_accents(key)
+        folded = strip_breathing(marked)
+        scores = {}
+
+        def add(lemma, parse, score):
+            if score < scores.get((lemma, parse), (9, 0)):
+                scores[lemma, parse] = score
+
+        for lemma in self.uninflected.get(folded, ()):
+            add(lemma, UNINFLECTED, (0, -1))
+        for spelt, unaccented, rank, lemma, parse in self.closed.get(folded, ()):
+            if spelt == key:
+                add(lemma, parse, (0, -3, rank))
+            elif unaccented == marked:
+                add(lemma, parse, (0, -2, rank))
+            else:
+                add(lemma, parse, (1, -1, rank))
+
+        node = self.suffixes
+        depth = 0
+        while True:
+            for rule in node.get(None, ()):
+                if rule[0] == "N":
+                    kind, cut, cell, accepted, rank = rule
+                    for lemma, gender, cat in self.nominal_stems.get(folded[:len(folded) - cut], ()):
+                        if cat in accepted and cell[2] in (gender, "-"):
+                            add(lemma, "----" + cell[:2] + gender + "-", (0, rank))
+                else:
+                    kind, tense_voice, person_number, rank = rule
+                    stem = folded[:len(folded) - depth]
+                    if not stem:
+                        continue
+                    parse = "{}{}{}I-{}--".format(person_number[0], tense_voice[0], tense_voice[1], person_number[1])
+                    for lemma in self.tense_stems.get((tense_voice, stem), ()):
+                        add(lemma, parse, (0, rank))
+                    for recovered, cost in self.recover(stem, tense_voice):
+                        for lemma in self.verb_stems.get(recovered, ()):
+                            add(lemma, parse, (cost, rank))
+            if depth == len(folded) or folded[-1 - depth] not in node:
+                break
+            node = node[folded[-1 - depth]]
+            depth += 1
+
+        result = [key for key, score in sorted(scores.items(), key=lambda x: (x[1], x[0]))]
+        self.memo[key] = result
+        return result
+
+    def analyze_batch(self, forms):
+        """
+        return form -> analyze(form) for many forms.
+        """
+        return {form: self.analyze(form) for form in set(forms)}
+
+
+def build(lexemes="lexemes.yaml", nominal_endings=NOMINAL_ENDINGS, verb_endings=VERB_ENDINGS,
+          principal_parts=PRINCIPAL_PARTS):
+    return Analyzer(
+        load_yaml(lexemes),
+        parse_nominal_endings(nominal_endings),
+        parse_verb_endings(verb_endings),
+        parse_principal_parts(principal_parts) if principal_parts else (),
+    )
+
+
+def load(lexemes="lexemes.yaml", nominal_endings=NOMINAL_ENDINGS, verb_endings=VERB_ENDINGS,
+         principal_parts=PRINCIPAL_PARTS):
+    """
+    return an Analyzer over the given files, cached until any of them
+    change.
+
+    principal_parts.txt supplies the stems of irregular tenses (ἦλθον,
+    εἶπον); pass principal_parts=None to rely on stem recovery alone.
+    """
+    filenames = [lexemes, nominal_endings, verb_endings]
+    if principal_parts:
+        filenames.append(principal_parts)
+    return cached(
+        "analyzer" if principal_parts else "analyzer-rules",
+        filenames,
+        lambda: build(lexemes, nominal_endings, verb_endings, principal_parts),
+        key=VERSION,
+    )
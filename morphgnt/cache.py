@@ -0,0 +1,60 @@
+import os
+import pickle
+
+
+CACHE_DIR = os.environ.get(
+    "MORPHGNT_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+)
+
+
+def signature(filenames, key=None):
+    """
+    return a value identifying the current state of the given files (and of
+    any extra key such as a package version).
+    """
+    sig = [key]
+    for filename in filenames:
+        st = os.stat(filename)
+        sig.append((os.path.abspath(filename), st.st_size, st.st_mtime_ns))
+    return tuple(sig)
+
+
+def cache_path(name, suffix=".pickle"):
+    return os.path.join(CACHE_DIR, name + suffix)
+
+
+def load(name):
+    """
+    return the (signature, value) stored under name, or (None, None).
+    """
+    try:
+        with open(cache_path(name), "rb") as f:
+            return pickle.load(f)
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None, None
+
+
+def store(name, sig, value):
+    path = cache_path(name)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = "{}.{}.tmp".format(path, os.getpid())
+    with open(tmp, "wb") as f:
+        pickle.dump((sig, value), f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+def cached(name, filenames, build, key=None):
+    """
+    return build() memoized on disk under the given name.
+
+    The stored value is discarded and rebuilt whenever any of filenames (or
+    the extra key) change.
+    """
+    sig = signature(filenames, key)
+    stored_sig, value = load(name)
+    if stored_sig == sig:
+        return value
+    value = build()
+    store(name, sig, value)
+    return value
@@ -0,0 +1,166 @@
+"""
+the noun classes adjectives and participles decline like.
+
+Each gender of an adjective (by mounce-morphcat) and of a participle (by
+aspect-voice and, for some, the class of its verb) declines like one or
+more noun classes of nominal_endings.yaml. Some of the classes (marked
+below) are made up for the purpose.
+"""
+
+
+ADJECTIVE_CATEGORIES = {
+    "a-1a(1)": {"M": ["n-2a"], "F": ["n-1a"], "N": ["n-2c"]},
+    "a=1a(1)/a-3": {"M": ["n-2a"], "F": ["n-1a", "n-2b"], "N": ["n-2c"]},
+    "a-1a(2a)": {"M": ["n-2a"], "F": ["n-1b"], "N": ["n-2c"]},
+    "a=1a(2a-POLUS)": {"M": ["n=2a(POLUS)"], "F": ["n-1b"], "N": ["n=2c(POLUS)"]},
+    "a=1a(2a-MEGAS)": {"M": ["n=2a(MEGAS)"], "F": ["n-1b"], "N": ["n=2c(MEGAS)"]},
+    "a=1a(2b-HO)": {"M": ["n=2a(HO)"], "F": ["n-1b"], "N": ["n=2c(HO)"]},
+    "a=1a(2b-HOS)": {"M": ["n-2a"], "F": ["n-1b"], "N": ["n=2c(HO)"]},
+    "a=1a(2b-HOSb)": {"M": ["n-2a"], "F": ["n-1b"], "N": ["n=2c(HO)", "n-2c"]},
+    "a-1b": {"M": ["n-2d"], "F": ["n=1h(ETA)"], "N": ["n-2d"]},
+    "a=1b(OMICRON)": {"M": ["n=2d(OMICRON)"], "F": ["n=1h(ETA)"], "N": ["n=2d(OMICRON)"]},
+    "a=1b(ALPHA-F)": {"M": ["n-2d"], "F": ["n=1h(ALPHA)"], "N": ["n-2d"]},
+    "a-2a": {"M": ["n=3c(5a-ALPHA)"], "F": ["n-1c"], "N": ["n=3c(5a-ALPHA)"]},
+    "a-2a(2)": {"M": ["n-3c(5b)"], "F": ["n-1c"], "N": ["n-3c(5b)"]},  # made up
+    "a-2a(3)": {"M": ["n-3f(1aS)"], "F": ["n-1c"], "N": ["n-3f(1aS)"]},  # made up
+    "a-2b": {"M": ["n-3e(5bF)"], "F": ["n-1a"], "N": ["n-3e(5bF)"]},  # made up
+    "a-3a": {"M": ["n-2a"], "F": ["n-2b"], "N": ["n-2c"]},
+    "a-3b(1)": {"M": ["n-2a"], "F": ["n-1a", "n-2b"], "N": ["n-2c"]},
+    "a-3b(2)": {"M": ["n-2a"], "F": ["n-1b", "n-2b"], "N": ["n-2c"]},
+    "a-4a": {"M": ["n-3d(2aA)"], "F": ["n-3d(2aA)"], "N": ["n-3d(2bA)"]},  # made up
+    "a=4a(TREIS)": {  # made up
+        "M": ["n-3d(2aA-TREIS)"], "F": ["n-3d(2aA-TREIS)"], "N": ["n-3d(2bA-TREIS)"],
+    },
+    "a-4b(1)": {"M": ["n=3f(1bA)"], "F": ["n=3f(1bA)"], "N": ["n=3f(1bA)"]},
+    "a=4b(1-EPSILON)": {
+        "M": ["n=3f(1bA-EPSILON)"], "F": ["n=3f(1bA-EPSILON)"], "N": ["n=3f(1bA-EPSILON)"],
+    },
+    "a-4b(2-TIS)": {"M": ["n-3f(TIS)"], "F": ["n-3f(TIS)"], "N": ["n-3f(TIS)"]},  # made up
+    "a=4b(2-EIS)": {"M": ["n-3f(EIS)"], "F": ["n-1a"], "N": ["n-3f(EIS)"]},  # made up
+}
+
+
+# verb classes whose present participles contract (-ῶν, -οῦντος and -ῶν,
+# -ῶντος)
+
+EPSILON_CONTRACT = {
+    "v-1d(2a)", "v-1d(2b)", "v-1d(3)", "cv-1d(2a)", "v-1b(4)", "cv-1d(2)",
+    "cv-1d(2b)", "cv-1a(7)", "cv-1d(3)", "v-1d(2)",
+}
+ALPHA_CONTRACT = {"v-1d(1a)", "v-1d(1b)", "cv-1d(1a)", "v-1d(1)", "cv-1d(1b)"}
+
+HISTEMI = {"ἵστημι", "παρίστημι", "συνίστημι", "περιΐστημι", "ἐφίστημι", "ἐνίστημι", "προΐστημι"}
+
+SECOND_DECLENSION = {"M": ["n-2a"], "F": ["n-1b"], "N": ["n-2c"]}
+
+# (aspect_voice, verb class) -> gender -> noun classes, the verb class being
+# None where the aspect_voice alone decides; all the third declension
+# classes are made up
+
+PARTICIPLE_CATEGORIES = {
+    ("PA", "ωμι"): {"M": ["n=3c(5a-OMICRON)"], "F": ["n-1c"], "N": ["n=3c(5a-OMICRON)"]},
+    ("PA", "νυμι"): {"M": ["n=3c(5a-UPSILON)", "n-3c(5b)"], "F": ["n-1c"], "N": ["n=3c(5a-UPSILON)"]},
+    ("PA", "ημι"): {"M": ["n=3c(5a-EPSILON)", "n-3c(5b)"], "F": ["n-1c"], "N": ["n=3c(5a-EPSILON)"]},
+    ("PA", "ε-contract"): {"M": ["n=3c(5b-OU)"], "F": ["n-1c"], "N": ["n=3c(5b-OU)"]},
+    ("PA", "α-contract"): {"M": ["n=3c(5b-W)"], "F": ["n-1c"], "N": ["n=3c(5b-W)"]},
+    ("PA", None): {"M": ["n-3c(5b)"], "F": ["n-1c"], "N": ["n-3c(5b)"]},
+    ("PM", None): SECOND_DECLENSION,
+    ("AA", "ημι"): {
+        "M": ["n=3c(5a-EPSILON)", "n=3c(5a-1A)"], "F": ["n-1c"], "N": ["n=3c(5a-EPSILON)", "n=3c(5a-1A)"],
+    },
+    ("AA", "ωμι"): {"M": ["n=3c(5a-OMICRON)"], "F": ["n-1c"], "N": ["n-3c(5a-AAP)"]},
+    ("AA", None): {"M": ["n=3c(5a-1A)", "n=3c(5a-2A)"], "F": ["n-1c"], "N": ["n=3c(5a-1A)", "n=3c(5a-2A)"]},
+    ("AM", None): SECOND_DECLENSION,
+    ("AP", None): {"M": ["n=3c(5a-EPSILON)"], "F": ["n-1c"], "N": ["n=3c(5a-EPSILON)"]},
+    ("XA", "ἵστημι"): {
+        "M": ["n=3c(1-XAP-OMEGA)", "n-3c(1-XAP)"], "F": ["n-1c"], "N": ["n=3c(1-XAP-OMEGA)", "n-3c(1-XAP)"],
+    },
+    ("XA", None): {"M": ["n-3c(1-XAP)"], "F": ["n-1c"], "N": ["n-3c(1-XAP)"]},
+    ("XM", None): SECOND_DECLENSION,
+    ("FA", None): {"M": ["n-3c(5b)"], "F": ["n-1c"], "N": ["n-3c(5b)"]},
+    ("FM", None): SECOND_DECLENSION,
+    ("FP", None): SECOND_DECLENSION,
+}
+
+
+def verb_class(cat, aspect_voice, lemma):
+    """
+    return the class of verb (of mounce-morphcat cat) that decides the noun
+    classes of its aspect_voice participles, or None if aspect_voice alone
+    does.
+    """
+    if aspect_voice == "PA":
+        for suffix in ["ωμι", "νυμι", "ημι"]:
+            if lemma.endswith(suffix):
+                return suffix
+        if cat in EPSILON_CONTRACT:
+            return "ε-contract"
+        if cat in ALPHA_CONTRACT:
+            return "α-contract"
+    elif aspect_voice == "AA":
+        if lemma.endswith("ημι"):
+            return "ημι"
+        if lemma.endswith(("ωμι", "ώσκω")):
+            return "ωμι"
+    elif aspect_voice == "XA":
+        if lemma in HISTEMI:
+            return "ἵστημι"
+    return None
+
+
+def noun_categories(cat, aspect_voice, gender, lemma):
+    """
+    return the noun classes the gender of lemma declines like as an
+    adjective or aspect_voice participle of mounce-morphcat cat ([cat] for
+    nouns).
+    """
+    if cat in ADJECTIVE_CATEGORIES:
+        return ADJECTIVE_CATEGORIES[cat][gender]
+    if cat.startswith(("v", "cv")):
+        assert (aspect_voice, None) in PARTICIPLE_CATEGORIES, aspect_voice
+        return PARTICIPLE_CATEGORIES[aspect_voice, verb_class(cat, aspect_voice, lemma)][gender]
+    return [cat]
+
+
+class NounCategories(object):
+    """
+    noun_categories of a lexeme's mounce-morphcats, resolved once per
+    (lemma, aspect_voice, gender).
+
+    A lemma is assumed to always come with the same mounce-morphcats.
+    """
+
+    def __init__(self):
+        self.resolved = {}
+
+    def resolve(self, mounce_cat, aspect_voice, gender, lemma):
+        key = (lemma, aspect_voice, gender)
+        if key not in self.resolved:
+            new_mounce_cat = set()
+            for cat in mounce_cat:
+                for c in noun_categories(cat, aspect_voice, gender, lemma):
+                    new_mounce_cat.add(c)
+            self.resolved[key] = new_mounce_cat
+        return self.resolved[key]
+
+
+if __name__ == "__main__":
+    assert noun_categories("n-2a", "--", "M", "λόγος") == ["n-2a"]
+    assert noun_categories("a-1a(2a)", "--", "F", "ἀγαθός") == ["n-1b"]
+    assert noun_categories("a=1a(2b-HOSb)", "--", "N", "τοσοῦτος") == ["n=2c(HO)", "n-2c"]
+    assert noun_categories("v-1d(2a)", "PA", "M", "ποιέω") == ["n=3c(5b-OU)"]
+    assert noun_categories("v-1d(1a)", "PA", "N", "ἀγαπάω") == ["n=3c(5b-W)"]
+    assert noun_categories("v-6a", "PA", "M", "τίθημι") == ["n=3c(5a-EPSILON)", "n-3c(5b)"]
+    assert noun_categories("v-6a", "PA", "M", "δίδωμι") == ["n=3c(5a-OMICRON)"]
+    assert noun_categories("v-3c(1)", "PA", "F", "δείκνυμι") == ["n-1c"]
+    assert noun_categories("v-1a(1)", "PA", "M", "λύω") == ["n-3c(5b)"]
+    assert noun_categories("v-5a", "AA", "N", "γινώσκω") == ["n-3c(5a-AAP)"]
+    assert noun_categories("v-1a(1)", "AA", "M", "λύω") == ["n=3c(5a-1A)", "n=3c(5a-2A)"]
+    assert noun_categories("v-6a", "XA", "M", "ἵστημι") == ["n=3c(1-XAP-OMEGA)", "n-3c(1-XAP)"]
+    assert noun_categories("v-1a(1)", "XA", "M", "λύω") == ["n-3c(1-XAP)"]
+    assert noun_categories("v-1a(1)", "FP", "F", "λύω") == ["n-1b"]
+
+    categories = NounCategories()
+    resolved = categories.resolve(["a-3a", "n-2b"], "--", "F", "ἔρημος")
+    assert resolved == {"n-2b"}
+    assert categories.resolve(["a-3a", "n-2b"], "--", "F", "ἔρημος") is resolved
@@ -0,0 +1,273 @@
+"""
+column-oriented tables of interned strings.
+
+Each column keeps its distinct values once and an array of integer codes
+into them, one per row, so per-value work (stripping accents, say) is done
+once per distinct value with map() and grouping compares small integers
+rather than strings.
+
+Tables (and other indexes of arrays) are stored on disk as
+
+    MAGIC, header length (8 bytes, little-endian), JSON header, padding,
+    each array in turn (native byte order, padded to 4 bytes)
+
+the header giving the arrays' typecodes, offsets and lengths and, for a
+table, the column names, their values and any metadata. read_file()
+memory-maps the arrays rather than reading them in.
+"""
+
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from .cache import CACHE_DIR, cache_path, signature
+
+
+MAGIC = b"MGNTCOL1"
+
+
+class Column(object):
+
+    def __init__(self, values=None, codes=None):
+        self.values = [] if values is None else values
+        self.index = None if values is not None else {}
+        self.codes = array("I") if codes is None else codes
+
+    def intern(self, value):
+        """
+        return the code of value, adding it to the column's values if new.
+        """
+        if self.index is None:
+            self.index = {value: code for code, value in enumerate(self.values)}
+        try:
+            return self.index[value]
+        except KeyError:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+            return code
+
+    def append(self, value):
+        self.codes.append(self.intern(value))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+    def __iter__(self):
+        values = self.values
+        return (values[code] for code in self.codes)
+
+    def map(self, function):
+        """
+        return a new column of function applied to each value, calling it
+        once per distinct value.
+        """
+        mapped = Column()
+        recode = [mapped.intern(function(value)) for value in self.values]
+        mapped.codes = array("I", [recode[code] for code in self.codes])
+        return mapped
+
+
+class Table(object):
+
+    def __init__(self, names, columns=None, meta=None):
+        self.names = list(names)
+        if columns is None:
+            columns = {name: Column() for name in self.names}
+        self.columns = columns
+        self.meta = {} if meta is None else meta
+
+    def append(self, row):
+        for name, value in zip(self.names, row):
+            self.columns[name].append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def __len__(self):
+        return len(self.columns[self.names[0]])
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def add_column(self, name, column):
+        assert len(column) == len(self), name
+        self.names.append(name)
+        self.columns[name] = column
+
+    def rows(self, start=0, stop=None):
+        """
+        yield a dict for each row from start up to stop.
+        """
+        names = self.names
+        iterators = [
+            map(self.columns[name].values.__getitem__, self.columns[name].codes[start:stop])
+            for name in names
+        ]
+        for values in zip(*iterators):
+            yield dict(zip(names, values))
+
+    def group_by(self, keys, values):
+        """
+        return key -> list of the distinct values found with it, in order of
+        first occurrence, where key is a tuple of the values of the keys
+        columns and each value a tuple of the values of the values columns.
+        """
+        key_columns = [self.columns[name] for name in keys]
+        value_columns = [self.columns[name] for name in values]
+        groups = {}
+        for key, value in zip(
+            zip(*[column.codes for column in key_columns]),
+            zip(*[column.codes for column in value_columns]),
+        ):
+            groups.setdefault(key, {})[value] = None
+        return {
+            decode(key_columns, key): [decode(value_columns, value) for value in group]
+            for key, group in groups.items()
+        }
+
+    def count_distinct(self, keys, name):
+        """
+        return key -> number of distinct values of the name column found
+        with it, keyed as in group_by.
+        """
+        return {key: len(group) for key, group in self.group_by(keys, [name]).items()}
+
+
+def decode(columns, codes):
+    return tuple(column.values[code] for column, code in zip(columns, codes))
+
+
+def read_delimited(f, names, separator=None):
+    """
+    return a Table of the lines of f split on separator (whitespace by
+    default) into the named columns.
+    """
+    table = Table(names)
+    for line in f:
+        fields = line.strip().split(separator)
+        if len(fields) != len(names):
+            raise ValueError("expected {} fields, got {}: {}".format(len(names), len(fields), line.strip()))
+        table.append(fields)
+    return table
+
+
+def write_file(filename, header, chunks):
+    """
+    store the JSON-able header and the arrays chunks in filename
+    (atomically, through a temporary file), each chunk 4-byte aligned.
+    """
+    header = dict(header, byteorder=sys.byteorder, chunks=[])
+    offset = 0
+    for chunk in chunks:
+        size = len(chunk) * chunk.itemsize
+        header["chunks"].append([chunk.typecode if isinstance(chunk, array) else chunk.format, offset, len(chunk)])
+        offset += size + -size % 4
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    tmp = "{}.{}.tmp".format(filename, os.getpid())
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        f.write(b"\0" * (-f.tell() % 4))
+        for chunk in chunks:
+            data = chunk.tobytes()
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 4))
+    os.replace(tmp, filename)
+
+
+def read_file(filename):
+    """
+    return the header and the (memory-mapped) chunks stored in filename.
+
+    Raises ValueError if filename wasn't written by write_file on this
+    platform.
+    """
+    with open(filename, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a column file".format(filename))
+        length, = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode("utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("{} was written on a {}-endian platform".format(filename, header["byteorder"]))
+        start = len(MAGIC) + 8 + length
+        start += -start % 4
+        if os.fstat(f.fileno()).st_size > start:
+            data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            data = memoryview(b"")
+    chunks = []
+    for typecode, offset, count in header["chunks"]:
+        size = array(typecode).itemsize * count
+        chunks.append(data[start + offset:start + offset + size].cast(typecode))
+    return header, chunks
+
+
+def cached_file(name, suffix, filenames, build, key=None):
+    """
+    return the header and chunks of the file build() returns the header
+    and chunks of, stored under name in the cache directory and
+    memory-mapped from there on later calls until any of filenames (or the
+    extra key) change.
+    """
+    sig = json.loads(json.dumps(signature(filenames, key)))
+    path = cache_path(name, suffix)
+    try:
+        header, chunks = read_file(path)
+        if header.get("signature") == sig:
+            return header, chunks
+    except (OSError, ValueError, KeyError):
+        pass
+    header, chunks = build()
+    header["signature"] = sig
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_file(path, header, chunks)
+    return read_file(path)
+
+
+def table_file(table):
+    """
+    return the header and chunks to store table as.
+    """
+    header = {
+        "names": table.names,
+        "values": [table[name].values for name in table.names],
+        "meta": table.meta,
+    }
+    return header, [table[name].codes for name in table.names]
+
+
+def file_table(header, chunks):
+    """
+    return the table stored as header and chunks.
+    """
+    columns = {
+        name: Column(values, codes)
+        for name, values, codes in zip(header["names"], header["values"], chunks)
+    }
+    return Table(header["names"], columns, header["meta"])
+
+
+def write(table, filename):
+    write_file(filename, *table_file(table))
+
+
+def read(filename):
+    """
+    return the table stored in filename, its codes memory-mapped.
+    """
+    return file_table(*read_file(filename))
+
+
+def cached_table(name, filenames, build, key=None):
+    """
+    return the table build() returns, cached as with cached_file.
+    """
+    return file_table(*cached_file(name, ".columns", filenames, lambda: table_file(build()), key))
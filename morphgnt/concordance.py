@@ -0,0 +1,119 @@
+"""
+lemma concordance of a fileset.
+
+The positions (row numbers in the fileset's table) of each lemma's tokens
+are stored as the first position (in the lemma's directory entry) and then
+deltas from the previous position, in 2-byte words when all the deltas fit
+and 4-byte ones otherwise, which halves the size of the postings of all but
+the few lemmas with gaps of 65536 rows or more between tokens. The index
+is built once per state of the fileset, memory-mapped from the cache after
+that, and a position leads straight back to the row (and so the bcv) in
+the fileset's table.
+"""
+
+from array import array
+from itertools import accumulate, chain
+
+from .columns import cached_file
+
+
+# bumped whenever what build() stores changes
+VERSION = 2
+
+
+def build(column, name):
+    """
+    return the header and chunks of the concordance of column (named name).
+    """
+    postings = [array("I") for _ in column.values]
+    for position, code in enumerate(column.codes):
+        postings[code].append(position)
+
+    # each entry is [typecode, offset, count, first position], the
+    # postings holding the count - 1 deltas after the first position
+    narrow = array("H")
+    wide = array("I")
+    directory = []
+    for positions in postings:
+        deltas = [b - a for a, b in zip(positions, positions[1:])]
+        first = positions[0] if positions else 0
+        if all(delta < 0x10000 for delta in deltas):
+            directory.append(["H", len(narrow), len(positions), first])
+            narrow.extend(deltas)
+        else:
+            directory.append(["I", len(wide), len(positions), first])
+            wide.extend(deltas)
+    header = {"column": name, "values": column.values, "directory": directory}
+    return header, [narrow, wide]
+
+
+class Concordance(object):
+
+    def __init__(self, table, header, chunks):
+        self.table = table
+        self.column = header["column"]
+        self.index = {value: code for code, value in enumerate(header["values"])}
+        self.directory = header["directory"]
+        self.postings = {"H": chunks[0], "I": chunks[1]}
+
+    def count(self, value):
+        """
+        return the number of tokens of value.
+        """
+        code = self.index.get(value)
+        if code is None:
+            return 0
+        return self.directory[code][2]
+
+    def positions(self, value):
+        """
+        return the positions of the tokens of value, in order.
+        """
+        code = self.index.get(value)
+        if code is None:
+            return []
+        typecode, offset, count, first = self.directory[code]
+        if not count:
+            return []
+        return list(accumulate(chain([first], self.postings[typecode][offset:offset + count - 1])))
+
+    def references(self, value):
+        """
+        return the bcv of each token of value.
+        """
+        bcv = self.table["bcv"]
+        return [bcv[position] for position in self.positions(value)]
+
+    def kwic(self, value, width=5, column="text"):
+        """
+        return (bcv, left context, token, right context) for each token of
+        value, the contexts being lists of up to width tokens of column
+        either side of it.
+        """
+        bcv = self.table["bcv"]
+        words = self.table[column]
+        values = words.values
+        codes = words.codes
+        results = []
+        for position in self.positions(value):
+            start = max(0, position - width)
+            results.append((
+                bcv[position],
+                [values[code] for code in codes[start:position]],
+                values[codes[position]],
+                [values[code] for code in codes[position + 1:position + 1 + width]],
+            ))
+        return results
+
+
+def load(fileset, column="lemma"):
+    """
+    return the (cached) concordance of column of fileset.
+    """
+    table = fileset.table()
+    header, chunks = cached_file(
+        "concordance-{}-{}".format(fileset.setname, column), ".postings",
+        list(fileset.files()), lambda: build(table[column], column),
+        key=(fileset.metadata.get("format"), fileset.columns(), VERSION),
+    )
+    return Concordance(table, header, chunks)
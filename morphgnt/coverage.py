@@ -0,0 +1,115 @@
+"""
+lexical coverage of a fileset by book and chapter.
+
+Everything is worked out from the integer lemma codes of the fileset's
+table: per-unit frequencies are counted over slices of the code array,
+sorted and summed into prefix sums (so the number of lemmas needed for any
+coverage is a binary search), and the first occurrence of every lemma in
+canonical order gives both the cumulative vocabulary curve and the new
+lemmas of each chapter.
+
+Units are runs of rows with the same bcv prefix, so the fileset is assumed
+to be in canonical order (as filesets.yaml's are).
+"""
+
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from itertools import accumulate, groupby
+import math
+
+from .filesets import BOOKS
+
+
+def book_name(bcv):
+    return BOOKS[int(bcv[:2])]
+
+
+def chapter_name(bcv):
+    return "{} {}".format(book_name(bcv), int(bcv[2:4]))
+
+
+class Unit(object):
+    """
+    a run of rows (a book, a chapter or the whole fileset) and the prefix
+    sums of its lemma frequencies, most frequent first.
+    """
+
+    def __init__(self, name, start, stop, codes):
+        self.name = name
+        self.start = start
+        self.stop = stop
+        self.counts = Counter(codes[start:stop])
+        self.cumulative = list(accumulate(sorted(self.counts.values(), reverse=True)))
+
+    @property
+    def tokens(self):
+        return self.stop - self.start
+
+    @property
+    def lemmas(self):
+        return len(self.counts)
+
+    def lemmas_for(self, percent):
+        """
+        return how many of its most frequent lemmas it takes to cover
+        percent of the unit's tokens.
+        """
+        needed = math.ceil(self.tokens * percent / 100)
+        return min(bisect_left(self.cumulative, needed) + 1, self.lemmas) if needed else 0
+
+
+class Coverage(object):
+
+    def __init__(self, table, name="all"):
+        self.lemma_values = table["lemma"].values
+        self.codes = table["lemma"].codes
+        chapters = table["bcv"].map(lambda bcv: bcv[:4])
+
+        self.chapters = []
+        position = 0
+        for code, run in groupby(chapters.codes):
+            length = sum(1 for _ in run)
+            bcv = chapters.values[code]
+            self.chapters.append(Unit(chapter_name(bcv), position, position + length, self.codes))
+            position += length
+
+        self.books = []
+        for book, units in groupby(self.chapters, key=lambda unit: unit.name.split()[0]):
+            units = list(units)
+            self.books.append(Unit(book, units[0].start, units[-1].stop, self.codes))
+
+        self.total = Unit(name, 0, len(self.codes), self.codes)
+
+        # the earliest position of each lemma (dict keeps the last value
+        # given for a key, hence the reversal)
+        n = len(self.codes)
+        self.first = dict(zip(reversed(self.codes), range(n - 1, -1, -1)))
+        self.first_positions = sorted(self.first.values())
+
+    def curve(self, units=None):
+        """
+        return (unit name, tokens so far, lemmas so far) at the end of each
+        of units (by default the chapters).
+        """
+        return [
+            (unit.name, unit.stop, bisect_right(self.first_positions, unit.stop - 1))
+            for unit in (self.chapters if units is None else units)
+        ]
+
+    def new_lemmas(self, units=None):
+        """
+        return (unit name, lemmas first found in it) for each of units (by
+        default the chapters), the lemmas in order of their overall
+        frequency (most frequent first) and then of first occurrence.
+        """
+        units = self.chapters if units is None else units
+        starts = [unit.start for unit in units]
+        found = [[] for _ in units]
+        for code, position in self.first.items():
+            i = bisect_right(starts, position) - 1
+            if i >= 0 and position < units[i].stop:
+                found[i].append((-self.total.counts[code], position, self.lemma_values[code]))
+        return [
+            (unit.name, [lemma for count, position, lemma in sorted(lemmas)])
+            for unit, lemmas in zip(units, found)
+        ]
@@ -0,0 +1,131 @@
+"""
+reversed-suffix automaton over ending_tree.txt.
+
+Each line of ending_tree.txt is
+
+    <suffix path> {<rule>} <parse> <count>
+
+where the suffix path lists successively longer endings of a form separated
+by slashes (e.g. ς/ος/βος/αβος/γαβος). Every ending becomes a node of a trie
+keyed by its characters read from the end of the word, carrying the counts
+of each parse and the rules seen with that ending.
+
+Endings carry no accents or breathing marks, so forms are stripped of them
+before analysis.
+"""
+
+from .cache import cached
+from .utils import strip_accents, strip_breathing
+
+
+class EndingTree(object):
+
+    def __init__(self):
+        self.parses = []  # parse id -> parse
+        self.parse_ids = {}
+        # per node
+        self.suffixes = [""]
+        self.counts = [{}]  # parse id -> count
+        self.rules = [set()]
+        # (node, character) -> child node
+        self.children = {}
+
+    def _parse_id(self, parse):
+        if parse not in self.parse_ids:
+            self.parse_ids[parse] = len(self.parses)
+            self.parses.append(parse)
+        return self.parse_ids[parse]
+
+    def _node(self, suffix):
+        node = 0
+        for depth, ch in enumerate(reversed(suffix), 1):
+            child = self.children.get((node, ch))
+            if child is None:
+                child = len(self.suffixes)
+                self.children[node, ch] = child
+                self.suffixes.append(suffix[-depth:])
+                self.counts.append({})
+                self.rules.append(set())
+            node = child
+        return node
+
+    def add(self, suffix, rule, parse, count):
+        node = self._node(suffix)
+        parse_id = self._parse_id(parse)
+        self.counts[node][parse_id] = self.counts[node].get(parse_id, 0) + count
+        self.rules[node].add(rule)
+
+    def node_data(self, node):
+        return (
+            self.suffixes[node],
+            {self.parses[p]: count for p, count in self.counts[node].items()},
+            self.rules[node],
+        )
+
+    def endings(self):
+        """
+        yield (ending, {parse: count}, rules) for every ending in the tree.
+        """
+        for node in range(1, len(self.suffixes)):
+            if self.counts[node]:
+                yield self.node_data(node)
+
+    def lookup(self, ending):
+        """
+        return ({parse: count}, rules) for exactly this ending.
+        """
+        node = 0
+        for ch in reversed(ending):
+            node = self.children.get((node, ch))
+            if node is None:
+                return {}, set()
+        suffix, counts, rules = self.node_data(node)
+        return counts, rules
+
+    def analyze_ending(self, form):
+        """
+        return (ending, {parse: count}, rules) for the longest ending of
+        form in the tree, or ("", {}, set()) if none is.
+        """
+        form = strip_breathing(strip_accents(form))
+        node = 0
+        best = 0
+        for ch in reversed(form):
+            node = self.children.get((node, ch))
+            if node is None:
+                break
+            if self.counts[node]:
+                best = node
+        return self.node_data(best)
+
+
+def parse_ending_tree(filename):
+    tree = EndingTree()
+    with open(filename) as f:
+        for line in f.read().splitlines():
+            if not line.strip():
+                continue
+            path, rule, parse, count = line.split()
+            rule = int(rule.strip("{}"))
+            count = int(count)
+            for step in path.split("/"):
+                tree.add(step, rule, parse, count)
+    return tree
+
+
+_loaded = {}
+
+
+def load(filename="ending_tree.txt"):
+    """
+    return the EndingTree for filename, cached until the file changes.
+    """
+    if filename not in _loaded:
+        _loaded[filename] = cached(
+            "ending_tree", [filename], lambda: parse_ending_tree(filename)
+        )
+    return _loaded[filename]
+
+
+def analyze_ending(form, filename="ending_tree.txt"):
+    return load(filename).analyze_ending(form)
@@ -1,26 +1,219 @@
+"""
+named sets of corpus files (see filesets.yaml).
+
+Each set gives the format of its files, which picks a reader from READERS.
+A reader takes an open text file and returns its rows as lists of fields,
+reading the file in one go rather than line by line. Files ending in .gz
+are decompressed on the fly whatever their format.
+
+A set may also give the names of its columns; MorphGNT's eight are
+assumed otherwise.
+
+When a set is read into its (cached) table, the rows of each verse are
+recorded by bcv, so rows(ref="Jn 3:1-21"), rows(book="Jn", chapter=3) and
+the like only touch the rows asked for.
+"""
+
+from bisect import bisect_left, bisect_right
+import csv
+import gzip
 import os.path
+import re
 
+from .columns import Table, cached_table
 from .utils import load_yaml
 
 
+FIELDS = ("bcv", "ccat-pos", "ccat-parse", "robinson", "text", "word", "norm", "lemma")
+
+BOOKS = [
+    None, "Mt", "Mk", "Lk", "Jn", "Ac", "Ro", "1Co", "2Co", "Ga",
+    "Eph", "Php", "Col", "1Th", "2Th", "1Ti", "2Ti", "Tit", "Phm",
+    "Heb", "Jas", "1Pe", "2Pe", "1Jn", "2Jn", "3Jn", "Jud", "Re",
+]
+
+# bumped whenever what read() stores changes, to discard cached tables
+TABLE_VERSION = 2
+
+
+def read_whitespace(f):
+    return [line.split() for line in f.read().splitlines() if line.strip()]
+
+
+def read_tsv(f):
+    return [line.split("\t") for line in f.read().splitlines() if line.strip()]
+
+
+def read_csv(f):
+    return [row for row in csv.reader(f.read().splitlines()) if row]
+
+
+READERS = {
+    "tisch-merge": read_whitespace,
+    "tsv": read_tsv,
+    "csv": read_csv,
+}
+
+
+def book_number(book):
+    """
+    return the two-digit bcv prefix of a book given by abbreviation (Jn) or
+    number.
+    """
+    if isinstance(book, int) or book.isdigit():
+        if not 1 <= int(book) < len(BOOKS):
+            raise ValueError("book number {} out of range 1-{}".format(book, len(BOOKS) - 1))
+        return "{:02d}".format(int(book))
+    if book not in BOOKS[1:]:
+        raise ValueError("unknown book {}".format(book))
+    return "{:02d}".format(BOOKS.index(book))
+
+
+REF_REGEX = re.compile(r"(\S+)(?:\s+(\d+)(?::(\d+))?(?:-(\d+)(?::(\d+))?)?)?$")
+
+
+def parse_ref(ref):
+    """
+    return the first and last bcv of a reference: a book (Jn), chapter
+    (Jn 3), verse (Jn 3:16) or range (Jn 3:1-21, Jn 3:16-4:2, Jn 3-4).
+
+    Raises ValueError for a range ending before it starts (as Jn 3:16-4,
+    which is Jn 3:16-3:4).
+    """
+    match = REF_REGEX.match(ref.strip())
+    if not match:
+        raise ValueError("can't parse reference {}".format(ref))
+    book, chapter, verse, to, to_verse = match.groups()
+    book = book_number(book)
+    if chapter is None:
+        return book + "0000", book + "9999"
+    if to_verse is not None:
+        end = (to, to_verse)
+    elif to is not None:
+        end = (chapter, to) if verse is not None else (to, None)
+    else:
+        end = (chapter, verse)
+    first = "{}{:02d}{:02d}".format(book, int(chapter), int(verse or 0))
+    last = "{}{:02d}{:02d}".format(book, int(end[0]), int(end[1]) if end[1] is not None else 99)
+    if last < first:
+        raise ValueError("reference {} ends before it starts".format(ref))
+    return first, last
+
+
+def open_text(filename):
+    if filename.endswith(".gz"):
+        return gzip.open(filename, "rt", encoding="utf-8")
+    return open(filename, encoding="utf-8")
+
+
 class FileSet(object):
 
     def __init__(self, setname, metadata):
         self.setname = setname
         self.metadata = metadata
+        self.loaded_table = None
+        self.verse_index = None
 
     def files(self):
         for filename in self.metadata["files"]:
             yield os.path.abspath(os.path.join(self.metadata["prefix"], filename))
 
-    def rows(self):
-        for filename in self.files():
-            with open(filename) as f:
-                for line in f:
-                    yield dict(zip(
-                        ("bcv", "ccat-pos", "ccat-parse", "robinson", "text", "word", "norm", "lemma"),
-                        line.strip().split()
-                    ))
+    def columns(self):
+        return tuple(self.metadata.get("columns", FIELDS))
+
+    def reader(self):
+        try:
+            return READERS[self.metadata.get("format", "tisch-merge")]
+        except KeyError:
+            raise ValueError("{}: unknown format {}".format(self.setname, self.metadata["format"]))
+
+    def read(self):
+        """
+        return a Table of the rows of the fileset's files.
+
+        Its meta["files"] lists [filename, first row, number of rows] and,
+        if there is a bcv column, meta["verses"] [bcv, file number, first
+        row, number of rows] for each run of rows of the same verse.
+        """
+        reader = self.reader()
+        columns = self.columns()
+        bcv_column = columns.index("bcv") if "bcv" in columns else None
+        table = Table(columns)
+        files = []
+        verses = []
+        for file_number, filename in enumerate(self.files()):
+            with open_text(filename) as f:
+                rows = reader(f)
+            start = len(table)
+            for i, row in enumerate(rows):
+                if len(row) != len(columns):
+                    raise ValueError("{} row {}: expected {} fields, got {}".format(
+                        filename, i + 1, len(columns), len(row)))
+                if bcv_column is not None:
+                    bcv = row[bcv_column]
+                    if verses and verses[-1][0] == bcv and verses[-1][1] == file_number:
+                        verses[-1][3] += 1
+                    else:
+                        verses.append([bcv, file_number, start + i, 1])
+            table.extend(rows)
+            files.append([filename, start, len(rows)])
+        table.meta["files"] = files
+        if bcv_column is not None:
+            table.meta["verses"] = verses
+        return table
+
+    def table(self):
+        """
+        return the fileset as a Table, memory-mapped from the cache once it
+        has been read.
+        """
+        if self.loaded_table is None:
+            self.loaded_table = cached_table(
+                "fileset-" + self.setname, list(self.files()), self.read,
+                key=(self.metadata.get("format"), self.columns(), TABLE_VERSION),
+            )
+        return self.loaded_table
+
+    def verse_ranges(self, first, last):
+        """
+        return the (start, stop) row ranges of the verses from bcv first to
+        last, in the order of the fileset.
+        """
+        if self.verse_index is None:
+            if "verses" not in self.table().meta:
+                raise ValueError("{} has no bcv column".format(self.setname))
+            verses = sorted((bcv, start, count) for bcv, file_number, start, count in self.table().meta["verses"])
+            self.verse_index = ([bcv for bcv, start, count in verses], verses)
+        keys, verses = self.verse_index
+        found = sorted(
+            (start, start + count)
+            for bcv, start, count in verses[bisect_left(keys, first):bisect_right(keys, last)]
+        )
+        ranges = []
+        for start, stop in found:
+            if ranges and ranges[-1][1] == start:
+                ranges[-1][1] = stop
+            else:
+                ranges.append([start, stop])
+        return [tuple(r) for r in ranges]
+
+    def rows(self, ref=None, book=None, chapter=None):
+        """
+        yield a dict for each row, or only for those of the reference ref
+        (see parse_ref) or of the given book or chapter of book.
+        """
+        if ref is None and book is None:
+            if chapter is not None:
+                raise ValueError("a chapter needs a book")
+            return self.table().rows()
+        if ref is None:
+            ref = str(book) if chapter is None else "{} {}".format(book, chapter)
+        return self.ref_rows(*parse_ref(ref))
+
+    def ref_rows(self, first, last):
+        table = self.table()
+        for start, stop in self.verse_ranges(first, last):
+            yield from table.rows(start, stop)
 
 
 def load(filename):
@@ -0,0 +1,110 @@
+"""
+approximate headword search.
+
+Headwords are folded (lowercased, accents and breathing stripped) and
+indexed by character trigram. A query's candidates are the headwords
+sharing the most trigrams with it, which are then verified and scored by
+edit distance over the folded forms.
+"""
+
+from collections import Counter, defaultdict
+import heapq
+
+from .utils import strip_accents, strip_breathing
+
+
+def fold(word):
+    return strip_breathing(strip_accents(word.lower()))
+
+
+def trigrams(folded):
+    padded = "##" + folded + "#"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit=None):
+    """
+    return the Levenshtein distance between a and b.
+
+    If limit is given, give up (returning limit + 1) as soon as the distance
+    is known to exceed it.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class TrigramIndex(object):
+
+    def __init__(self, headwords):
+        self.headwords = sorted(set(headwords))
+        self.folded = [fold(headword) for headword in self.headwords]
+        self.grams = [trigrams(folded) for folded in self.folded]
+        postings = defaultdict(list)
+        for i, grams in enumerate(self.grams):
+            for gram in grams:
+                postings[gram].append(i)
+        self.postings = {gram: tuple(ids) for gram, ids in postings.items()}
+
+    def search(self, word, k=5, candidates=20):
+        """
+        return up to k (headword, score) pairs, best first, where score is
+        1 - edit distance / length of the longer folded form.
+
+        Only the `candidates` headwords sharing the most trigrams with word
+        are verified.
+        """
+        folded = fold(word)
+        grams = trigrams(folded)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+        # rank by Dice coefficient of the trigram sets
+        ranked = heapq.nlargest(
+            candidates, shared.items(),
+            key=lambda item: item[1] / (len(grams) + len(self.grams[item[0]])),
+        )
+        results = []
+        for i, count in ranked:
+            other = self.folded[i]
+            length = max(len(folded), len(other), 1)
+            if len(results) >= k:
+                # only distances beating the current k-th best matter
+                worst = results[k - 1][0]
+                limit = int((1 - worst) * length)
+            else:
+                limit = None
+            score = 1 - edit_distance(folded, other, limit) / length
+            results.append((score, self.headwords[i]))
+            results.sort(key=lambda x: (-x[0], x[1]))
+        return [(headword, score) for score, headword in results[:k]]
+
+    def search_batch(self, words, k=5, candidates=20):
+        """
+        return word -> search(word) for many words, searching each distinct
+        folded form only once.
+        """
+        by_folded = {}
+        results = {}
+        for word in words:
+            folded = fold(word)
+            if folded not in by_folded:
+                by_folded[folded] = self.search(word, k, candidates)
+            results[word] = by_folded[folded]
+        return results
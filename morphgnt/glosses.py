@@ -0,0 +1,143 @@
+"""
+inverted index over the English glosses and dictionary entries of lexemes.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+import math
+import re
+
+from . import cache
+from .utils import load_yaml
+
+
+FIELDS = ["gloss", "danker-entry", "dodson-entry"]
+
+TOKEN_REGEX = re.compile(r"\w+")
+
+# a query term is tokenized as indexed text is, keeping the * of a prefix
+# query
+QUERY_REGEX = re.compile(TOKEN_REGEX.pattern + r"\*?")
+
+
+def tokenize(text):
+    return TOKEN_REGEX.findall(text.lower())
+
+
+def query_terms(query):
+    """
+    return the terms of query: its tokens (as tokenize gives them), a prefix
+    term keeping its trailing *.
+    """
+    return QUERY_REGEX.findall(query.lower())
+
+
+def indexed_text(metadata):
+    parts = []
+    for field in FIELDS:
+        value = metadata.get(field)
+        if isinstance(value, list):
+            parts.extend(str(v) for v in value)
+        elif value is not None:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+class GlossIndex(object):
+
+    def __init__(self):
+        # term -> {headword: term frequency}
+        self.postings = {}
+        # headword -> text that was indexed for it
+        self.texts = {}
+        self.vocabulary = []
+
+    def _add(self, headword, text):
+        self.texts[headword] = text
+        for term, tf in Counter(tokenize(text)).items():
+            self.postings.setdefault(term, {})[headword] = tf
+
+    def _remove(self, headword):
+        for term in set(tokenize(self.texts.pop(headword))):
+            postings = self.postings[term]
+            del postings[headword]
+            if not postings:
+                del self.postings[term]
+
+    def update(self, lexemes):
+        """
+        bring the index in line with lexemes, re-tokenizing only the
+        lexemes whose indexed fields changed. Returns the number of
+        lexemes (re)indexed or removed.
+        """
+        changed = 0
+        for headword in [h for h in self.texts if h not in lexemes]:
+            self._remove(headword)
+            changed += 1
+        for headword, metadata in lexemes.items():
+            text = indexed_text(metadata)
+            if self.texts.get(headword) == text:
+                continue
+            if headword in self.texts:
+                self._remove(headword)
+            self._add(headword, text)
+            changed += 1
+        if changed:
+            self.vocabulary = sorted(self.postings)
+        return changed
+
+    def expand(self, term):
+        """
+        return the indexed terms matching term, which may end in * for a
+        prefix query.
+        """
+        if not term.endswith("*"):
+            return [term] if term in self.postings else []
+        prefix = term[:-1]
+        terms = []
+        for i in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            if not self.vocabulary[i].startswith(prefix):
+                break
+            terms.append(self.vocabulary[i])
+        return terms
+
+    def search(self, query, mode="and"):
+        """
+        return [(headword, score), ...] best first for the terms of query
+        (see query_terms), so "son-in-law" or "lamb," match as indexed.
+
+        With mode "and" every term (or one of a prefix term's expansions)
+        must match; with "or" any may. Scores are summed tf-idf.
+        """
+        n = len(self.texts) or 1
+        scores = Counter()
+        matched = None
+        for term in query_terms(query):
+            hits = set()
+            for t in self.expand(term):
+                postings = self.postings[t]
+                idf = math.log(n / len(postings)) + 1
+                for headword, tf in postings.items():
+                    scores[headword] += tf * idf
+                    hits.add(headword)
+            if mode == "and":
+                matched = hits if matched is None else matched & hits
+        if mode == "and":
+            scores = {headword: scores[headword] for headword in matched or ()}
+        return sorted(scores.items(), key=lambda x: (-x[1], x[0]))
+
+
+def gloss_index(filename="lexemes.yaml"):
+    """
+    return a GlossIndex over filename, persisted in the cache and updated
+    incrementally when the file changes.
+    """
+    sig = cache.signature([filename])
+    stored_sig, index = cache.load("gloss_index")
+    if stored_sig == sig:
+        return index
+    if index is None:
+        index = GlossIndex()
+    index.update(load_yaml(filename))
+    cache.store("gloss_index", sig, index)
+    return index
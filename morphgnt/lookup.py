@@ -0,0 +1,135 @@
+"""
+indexes for looking up lexemes.yaml headwords.
+"""
+
+from collections import defaultdict
+
+from .cache import cached
+from .utils import load_yaml, strip_accents, strip_breathing
+
+
+# from most to least precise
+LEVELS = ["exact", "casefold", "accents", "breathing"]
+
+
+def normalization_keys(word):
+    """
+    return the key of word at each of LEVELS.
+    """
+    casefold = word.lower()
+    accents = strip_accents(casefold)
+    return (word, casefold, accents, strip_breathing(accents))
+
+
+class LexemeIndex(object):
+    """
+    maps each normalization level's key to the headwords sharing that key,
+    so that e.g. αββα finds ἀββά at the "breathing" level.
+    """
+
+    def __init__(self, headwords):
+        keys = [defaultdict(list) for level in LEVELS]
+        for headword in sorted(headwords):
+            for level_keys, key in zip(keys, normalization_keys(headword)):
+                level_keys[key].append(headword)
+        self.keys = [
+            {key: tuple(candidates) for key, candidates in level_keys.items()}
+            for level_keys in keys
+        ]
+
+    def candidates(self, word, level="breathing"):
+        """
+        return the headwords matching word at the given level.
+        """
+        i = LEVELS.index(level)
+        return self.keys[i].get(normalization_keys(word)[i], ())
+
+    def resolve(self, word, max_level="breathing"):
+        """
+        return (level, headwords) for the most precise level (no looser than
+        max_level) at which word matches anything, or (None, ()).
+        """
+        stop = LEVELS.index(max_level) + 1
+        for level, level_keys, key in zip(LEVELS[:stop], self.keys, normalization_keys(word)):
+            if key in level_keys:
+                return level, level_keys[key]
+        return None, ()
+
+    def resolve_unique(self, word, max_level="breathing"):
+        """
+        return the single headword word resolves to, or None if it matches
+        nothing or is ambiguous.
+        """
+        level, headwords = self.resolve(word, max_level)
+        if len(headwords) == 1:
+            return headwords[0]
+        return None
+
+
+def lexeme_index(filename="lexemes.yaml"):
+    """
+    return a LexemeIndex over filename, cached until the file changes.
+    """
+    return cached(
+        "lexeme_index", [filename],
+        lambda: LexemeIndex(load_yaml(filename).keys()),
+    )
+
+
+def _numbers(value):
+    if value is None:
+        return ()
+    if isinstance(value, list):
+        return tuple(int(v) for v in value)
+    return (int(value),)
+
+
+class NumberIndex(object):
+    """
+    dense tables from Strong's and GK numbers to headwords, plus the
+    reverse maps.
+    """
+
+    def __init__(self, lexemes):
+        self.by_strongs = []
+        self.by_gk = []
+        self.strongs = {}
+        self.gk = {}
+        for headword, metadata in sorted(lexemes.items()):
+            for name, table, reverse in [
+                ("strongs", self.by_strongs, self.strongs),
+                ("gk", self.by_gk, self.gk),
+            ]:
+                numbers = _numbers(metadata.get(name))
+                if numbers:
+                    reverse[headword] = numbers
+                for number in numbers:
+                    if number >= len(table):
+                        table.extend([()] * (number + 1 - len(table)))
+                    table[number] += (headword,)
+
+    def headwords_for_strongs(self, number):
+        if 0 <= number < len(self.by_strongs):
+            return self.by_strongs[number]
+        return ()
+
+    def headwords_for_gk(self, number):
+        if 0 <= number < len(self.by_gk):
+            return self.by_gk[number]
+        return ()
+
+    def strongs_for(self, headword):
+        return self.strongs.get(headword, ())
+
+    def gk_for(self, headword):
+        return self.gk.get(headword, ())
+
+
+def number_index(filename="lexemes.yaml"):
+    """
+    return a NumberIndex over filename, cached until the file changes.
+    """
+    return cached(
+        "number_index", [filename],
+        lambda: NumberIndex(load_yaml(filename)),
+    )
@@ -0,0 +1,187 @@
+"""
+merge fields from external lexica into the lexemes in a single pass.
+
+Each source is declared once (see sources.yaml) with how to read it, which
+column is its key, how that key is normalized, which lexeme values to look
+it up by and which lexeme fields it fills in. normalize-values gives how
+the values of some of those fields are normalized and normalize-agree how
+the source values compared with the lexeme's by agree are.
+"""
+
+from collections import defaultdict
+import re
+
+from .utils import load_yaml, load_wordset, nfkc_normalize, strip_accents
+
+
+def first_comma(s):
+    return s.split(",")[0].strip()
+
+
+def leading_int(s):
+    m = re.match(r"\s*(\d+)", str(s))
+    return int(m.group(1)) if m else None
+
+
+NORMALIZERS = {
+    "nfkc": nfkc_normalize,
+    "first-comma": first_comma,
+    "fold-accents": strip_accents,
+    "lower": str.lower,
+    "int": leading_int,
+}
+
+
+def delimited_reader(delimiter):
+    def read(filename, columns):
+        with open(filename) as f:
+            for line in f.read().splitlines():
+                if line.strip():
+                    yield dict(zip(columns, line.strip().split(delimiter)))
+    return read
+
+
+def read_yaml(filename, columns):
+    for key, value in load_yaml(filename).items():
+        yield dict(zip(columns, [key, value]))
+
+
+READERS = {
+    "lines": delimited_reader("\n"),
+    "tsv": delimited_reader("\t"),
+    "colon": delimited_reader(":"),
+    "pipe": delimited_reader("|"),
+    "yaml": read_yaml,
+}
+
+
+class Source(object):
+
+    def __init__(self, name, metadata):
+        self.name = name
+        self.metadata = metadata
+        self.normalizers = [NORMALIZERS[n] for n in metadata.get("normalize", [])]
+        self.value_normalizers = {
+            name: [NORMALIZERS[n] for n in names]
+            for name, names in metadata.get("normalize-values", {}).items()
+        }
+        self.agree_normalizers = [NORMALIZERS[n] for n in metadata.get("normalize-agree", [])]
+        self.fields = metadata["fields"]
+        self.match = metadata.get("match", ["lexeme"])
+        self.agree = metadata.get("agree", {})
+        self.multiple = metadata.get("multiple")
+        if "missing" in metadata:
+            self.missing = load_wordset(metadata["missing"])
+        else:
+            self.missing = set()
+
+    def normalize(self, value, normalizers=None):
+        for normalizer in self.normalizers if normalizers is None else normalizers:
+            if value is None:
+                break
+            value = normalizer(value)
+        return value
+
+    def rows(self):
+        reader = READERS[self.metadata["format"]]
+        return reader(self.metadata["filename"], self.metadata["columns"])
+
+    def build_index(self):
+        """
+        return normalized key -> list of rows.
+        """
+        index = defaultdict(list)
+        key_column = self.metadata["key"]
+        for row in self.rows():
+            key = self.normalize(row[key_column])
+            if key is not None:
+                index[key].append(row)
+        return index
+
+    def lookup_keys(self, lexeme, metadata):
+        """
+        yield the normalized keys to try for the given lexeme, in order.
+        """
+        for name in self.match:
+            value = lexeme if name == "lexeme" else metadata.get(name)
+            if value is None:
+                continue
+            for v in (value if isinstance(value, list) else [value]):
+                key = self.normalize(str(v))
+                if key is not None:
+                    yield key
+
+
+class Report(object):
+
+    def __init__(self, source):
+        self.source = source
+        self.unmatched_lexemes = []
+        self.unmatched_keys = []
+        self.problems = []
+        self.skipped = 0
+        self.filled = 0
+
+
+def merge(lexemes, sources):
+    """
+    return (merged lexemes, list of Report) after filling each lexeme's
+    missing fields from every source in one pass over the lexemes.
+
+    Existing values are never overwritten.
+    """
+    indexes = [source.build_index() for source in sources]
+    used = [set() for source in sources]
+    reports = [Report(source) for source in sources]
+
+    merged = {}
+    for lexeme, metadata in lexemes.items():
+        metadata = dict(metadata)
+        for source, index, used_keys, report in zip(sources, indexes, used, reports):
+            rows = None
+            for key in source.lookup_keys(lexeme, metadata):
+                if key in index:
+                    used_keys.add(key)
+                    rows = index[key]
+                    break
+
+            todo = [name for name in source.fields if name not in metadata]
+            if not todo:
+                continue
+            if lexeme in source.missing:
+                report.skipped += 1
+                continue
+            if rows is None:
+                report.unmatched_lexemes.append(lexeme)
+                continue
+            if len(rows) > 1 and source.multiple != "join":
+                report.problems.append("{} matches {} entries".format(lexeme, len(rows)))
+                continue
+            disagreements = []
+            if len(rows) == 1:
+                for name, column in source.agree.items():
+                    theirs = source.normalize(rows[0].get(column), source.agree_normalizers)
+                    if metadata.get(name) != theirs:
+                        disagreements.append((name, metadata.get(name), theirs))
+            if disagreements:
+                report.problems.extend(
+                    "{} {}: {} != {}".format(lexeme, name, ours, theirs)
+                    for name, ours, theirs in disagreements
+                )
+                continue
+            for name in todo:
+                column = source.fields[name]
+                metadata[name] = ", ".join(
+                    source.normalize(row[column], source.value_normalizers.get(name, [])) for row in rows
+                )
+            report.filled += 1
+        merged[lexeme] = metadata
+
+    for index, used_keys, report in zip(indexes, used, reports):
+        report.unmatched_keys = sorted(set(index) - used_keys, key=str)
+
+    return merged, reports
+
+
+def load(filename):
+    return load_yaml(filename, Source)
@@ -0,0 +1,445 @@
+"""
+generation of full nominal paradigms from a lexeme's stem and category.
+
+The theme of a lexeme comes from its lemma and mounce-morphcat (as in
+morphgnt.analyze); each of its noun classes and genders then picks up a
+template of endings from nominal_endings.yaml, and the theme plus ending is
+accented persistently from the lemma (through morphgnt.accent).
+"""
+
+import re
+import unicodedata
+
+from accentuation import OXYTONE, PROPAROXYTONE, PROPERISPOMENON, get_accent_type
+
+from . import accent, sblgnt
+from .analyze import NOMINAL_ENDINGS, citation_endings, morphcats, nominal_themes, parse_nominal_endings
+from .fuzzy import fold
+from .utils import strip_accents
+
+
+CASE_NUMBERS = ["NS", "GS", "DS", "AS", "VS", "NP", "GP", "DP", "AP", "VP"]
+GENDERS = ["M", "F", "N"]
+OBLIQUE = ["GS", "DS", "GP", "DP"]
+
+FIRST_SECOND = ("n-1", "n=1", "n-2", "n=2")
+THIRD = ("n-3", "n=3")
+
+LONG_ALPHA = "ᾱ"
+LONG_IOTA = "ῑ"
+MACRON = "\u0304"
+
+# third declension classes whose oxytone endings are contracted, so take a
+# circumflex on a long ultima (ἀληθής, ἀληθοῦς; βασιλεύς, βασιλεῖς; ὀξύς,
+# ὀξεῖς)
+CONTRACTED = ("n-3d", "n-3e(3)", "n-3e(5bF)")
+LONG_ULTIMA = re.compile("(ει|ευ|ου|η|ω)[νς]?$")
+
+# lemmas that are themselves comparatives or superlatives (by their folded
+# ending)
+COMPARATIVE = re.compile("(τερος|τερον|ιων|ιον|σσων|ττων|ζων|ρων)$")
+SUPERLATIVE = re.compile("(τατος|ιστος|ιστα)$")
+
+# syncopated classes (πατήρ, πατρός, πατέρα; ἀνήρ, ἀνδρός, ἄνδρα)
+SYNCOPATED = ("n-3f(2c)", "n=3f(2c-D)")
+
+# monosyllables whose genitive plural and dative plural aren't on the
+# ending (παίδων, πάντων, πᾶσι)
+MONOSYLLABLE_EXCEPTIONS = {
+    "GP": {"παῖς", "φῶς", "οὖς", "πᾶς"},
+    "DP": {"πᾶς"},
+}
+
+
+def mark_length(form, lemma, case_number, cat, adjective, suffixed):
+    """
+    return form with the α of a first declension ending marked long where
+    it is: always in -ας (ἀληθείᾱς, χώρᾱς), and in -α and -αν unless the
+    class has a short one (δόξα), the lemma's accent shows it is short
+    (ἀλήθεια, γλῶσσα) or it is the feminine of an adjective with a
+    suffixed theme (βαρεῖα). The ι of -ίτης is long too (πολῖται).
+    """
+    if fold(lemma).endswith("ιτης") and "ιτ" in form:
+        i = form.rindex("ιτ")
+        form = form[:i] + LONG_IOTA + form[i + 1:]
+    if form.endswith("ας"):
+        return form[:-2] + LONG_ALPHA + "ς"
+    if not form.endswith(("α", "αν")) or case_number[1] == "P":
+        return form
+    if cat.startswith("n-1c") or suffixed or (cat.startswith("n-1f") and case_number == "VS"):
+        return form
+    if not adjective and fold(lemma).endswith("α") and accent.default.constraint(lemma)[1] in (
+        PROPAROXYTONE, PROPERISPOMENON
+    ):
+        return form
+    i = form.rindex("α")
+    return form[:i] + LONG_ALPHA + form[i + 1:]
+
+
+def unmark(form):
+    """
+    return form without the vowel length mark_length marked.
+    """
+    return unicodedata.normalize("NFC", unicodedata.normalize("NFD", form).replace(MACRON, ""))
+
+
+def accentuate(form, lemma, case_number, cat, adjective=False, suffixed=False):
+    """
+    return form accented like lemma, in case_number of noun class cat.
+
+    The accent is persistent but for a few shapes the lemma doesn't show:
+    the length of first declension α, the oxytone genitive and dative of
+    third declension monosyllables (ποδός, ποσί) and syncopated stems
+    (πατρός, πατέρα), contracted ultimas (ἀληθεῖς) and the -ῶν of first
+    declension genitive plurals.
+    """
+    if cat.startswith(("n-1", "n=1")):
+        form = mark_length(form, lemma, case_number, cat, adjective, suffixed)
+    try:
+        lemma_length, lemma_accent = accent.default.constraint(lemma)
+        if lemma_accent is None:
+            raise ValueError("{} is unaccented".format(lemma))
+        if cat.startswith(THIRD) and strip_accents(form) != strip_accents(lemma):
+            if lemma_length == 1 or cat.startswith(SYNCOPATED):
+                if case_number in ["GS", "DS"]:
+                    return accent.oxytone(form)
+                if case_number == "VS":
+                    return accent.recessive(form, default_short=True)
+            if lemma_length == 1:
+                if case_number in ["GP", "DP"] and lemma not in MONOSYLLABLE_EXCEPTIONS[case_number]:
+                    return accent.perispomenon(form) if case_number == "GP" else accent.oxytone(form)
+                if case_number != "DP" and len(accent.syllabify(form)) > 1:
+                    return accent.recessive(form, default_short=True)
+            elif cat.startswith(SYNCOPATED):
+                if case_number == "DP":
+                    return accent.paroxytone(form)
+                if cat == "n=3f(2c-D)":
+                    return accent.perispomenon(form) if case_number == "GP" else accent.recessive(form, default_short=True)
+                return accent.paroxytone(form)
+            if cat == "n=3f(1bA)" and case_number in ["NS", "AS", "VS"]:
+                # κρεῖττον, εὔσχημον
+                return accent.recessive(form, default_short=True)
+        if cat.startswith("n-3e") and case_number in ["GS", "GP"] and form.endswith(("εως", "εων")):
+            # the ω of -εως and -εων doesn't stop the accent staying on
+            # the antepenult (πόλεως, πόλεων)
+            accented = accent.persistent(form[:-2] + "ος", lemma)
+            return accented[:-2] + form[-2:]
+        accented = accent.persistent(form, lemma)
+    except (ValueError, IndexError):
+        # e.g. an unaccented lemma
+        return unmark(form)
+    if cat.startswith(FIRST_SECOND):
+        if case_number == "GP" and cat.startswith(("n-1", "n=1")) and (suffixed or not adjective):
+            # first declension genitive plurals of nouns are all -ῶν
+            accented = accent.perispomenon(form)
+        elif case_number[0] in "GD" and lemma_accent == OXYTONE and not suffixed:
+            accented = accent.perispomenon(form)
+    elif cat.startswith("n-3d") and case_number == "GP" and not form.endswith("εων"):
+        # contracted -ῶν (ἐθνῶν, τριῶν)
+        accented = accent.perispomenon(form)
+    elif cat.startswith(CONTRACTED) and strip_accents(form) != strip_accents(lemma):
+        if get_accent_type(accented) == OXYTONE and LONG_ULTIMA.search(form):
+            accented = accent.perispomenon(form)
+    return unmark(accented)
+
+
+# ablaut grades, syncope (_) and the δ of ἀνδρός don't change which stem
+# an ending belongs to
+ALTERNATIONS = re.compile(r"^(?:ει|[εηοω_])+|δ(?=ρ)")
+
+VOWELS = "αεηιουω"
+
+GENITIVE = re.compile("(ος|ως|ους)$")
+
+# lemmas of a class whose endings are another (sub)class's, by the
+# ending of the folded lemma
+SUBCLASSES = {
+    # contracts in -οῦς whose feminine is -ᾶ after ε, ι and ρ (ἀργυρᾶ)
+    "a-1b": [(ending, "a=1b(ALPHA-F)") for ending in ["εους", "ιους", "ρους"]],
+    "n-3c(2)": [("ους", "n=3c(2-OD)")],  # πούς, ποδός
+    "n-3f(2a)": [("ειρ", "n=3f(2a-XEIR)")],  # χείρ, χειρός
+    "n-3f(2c)": [("νηρ", "n=3f(2c-D)")],  # ἀνήρ, ἀνδρός
+}
+
+# the feminine of third declension adjectives adds a suffix to the theme
+# (πᾶς, πᾶσα; βαρύς, βαρεῖα)
+FEMININE_SUFFIXES = {"a-2a": "ασ", "a-2b": "ει"}
+
+# classes whose nominative has another stem from the other cases (ὕδωρ,
+# ὕδατος; γυνή, γυναικός)
+HETEROCLITIC = ("n-3c(6b)", "n=3b(1GUNH)")
+
+
+def stems(explanation):
+    """
+    return the normalized stems (what precedes the "+") an explanation of
+    nominal_endings.yaml gives its ending, "" for a vowel stem. An ending
+    whose stem is unknown (*+α) fits any stem, so gives None, but one
+    without any analysis (*) gives no stems.
+    """
+    found = set()
+    for part in explanation.split("/"):
+        head, plus, tail = part.partition("+")
+        if not plus:
+            if re.search(r"[*$]", part):
+                return set()
+            head = ""
+        if head and not head.strip("*?"):
+            return None
+        head = re.sub(r"[.!?*]", "", head)
+        if all(ch in VOWELS for ch in head):
+            found.add("")
+        else:
+            found.add(ALTERNATIONS.sub("", head))
+    return found
+
+
+def cut_before_stem(cell, ending, theme_ending, class_regex, explanation):
+    """
+    return an entry of parse_nominal_endings, but for an ending cut after a
+    consonant stem that the class's other endings repeat (ὠδίν, ιν. with
+    stem ν+, ὠδῖνος) cut before the stem instead, so the theme doesn't
+    have it.
+    """
+    head = explanation.partition("+")[0]
+    if not theme_ending and head and head not in VOWELS and re.fullmatch("[^.*$/]+", head) and ending.endswith(head):
+        theme_ending = head
+    return cell, ending, theme_ending, class_regex, explanation
+
+
+def dodson_genders(metadata):
+    """
+    return the genders dodson-pos gives a noun (N:F,N:M -> FM), or "" if
+    it doesn't give any.
+    """
+    return "".join(
+        part[2:] for part in str(metadata.get("dodson-pos", "")).split(",")
+        if part.startswith("N:") and part[2:] in GENDERS
+    )
+
+
+class Generator(object):
+
+    def __init__(self, nominal_endings):
+        self.endings = [cut_before_stem(*entry) for entry in nominal_endings]
+        self.citation = citation_endings(self.endings)
+        self.regexes = {}
+        self.templates = {}
+
+    def template(self, cat, gender):
+        """
+        return case_number -> [(context, theme ending, stems), ...] of the
+        endings nouns of class cat take in gender, in order of preference.
+
+        Templates are shared by all lexemes of a class so are only worked
+        out once.
+        """
+        key = (cat, gender)
+        if key not in self.templates:
+            template = {}
+            for cell, ending, theme_ending, class_regex, explanation in self.endings:
+                if cell[2] not in (gender, "-"):
+                    continue
+                if class_regex not in self.regexes:
+                    self.regexes[class_regex] = re.compile(class_regex)
+                if self.regexes[class_regex].match(cat):
+                    context = ending[:len(ending) - len(theme_ending)]
+                    template.setdefault(cell[:2], []).append((context, theme_ending, stems(explanation)))
+            self.templates[key] = template
+        return self.templates[key]
+
+    def endings_for(self, folded, theme, cat, gender):
+        """
+        return case_number -> theme ending of a theme of class cat in
+        gender.
+
+        The nominative singular is the ending the lemma has (or for the
+        other genders of an adjective the first that fits the theme), and
+        the other cells only take endings of the same stem, so a class
+        whose entries cover several stems (γάλα, γάλακτος but μέλι,
+        μέλιτος) doesn't mix them. Cells with no ending of their own are
+        filled the way they always are in Greek: the plural vocative is
+        the nominative, so is the singular one where the class has no
+        vocative ending, and neuters have the same nominative, accusative
+        and vocative.
+        """
+        template = self.template(cat, gender)
+        # the masculine and feminine of a class decline alike, so a cell
+        # only one of them has an ending for takes it from the other
+        other = self.template(cat, {"M": "F", "F": "M"}.get(gender, gender))
+        nominatives = [
+            option for option in template.get("NS") or other.get("NS", [])
+            if theme.endswith(option[0])
+        ]
+        cited = [option for option in nominatives if theme + option[1] == folded]
+        nominatives = cited or nominatives[:1]
+        known = [option[2] for option in nominatives if option[2]]
+        anchor = set().union(*known) if known else None
+        if cat in HETEROCLITIC or (cat[2] == "3" and anchor == {""}):
+            # a third declension nominative in a vowel is the bare stem
+            # (γόνυ, γόνατος)
+            anchor = None
+
+        endings = {"NS": nominatives[0][1]} if nominatives else {}
+        for case_number in CASE_NUMBERS[1:]:
+            options = [
+                (theme_ending, found)
+                for context, theme_ending, found in template.get(case_number, []) + other.get(case_number, [])
+                if theme.endswith(context)
+            ]
+            fitting = [
+                theme_ending for theme_ending, found in options
+                if anchor is None or found is None or found & anchor
+            ]
+            # endings with no analysis at all are the last resort
+            fitting += [theme_ending for theme_ending, found in options if found == set()]
+            if fitting:
+                endings[case_number] = fitting[0]
+
+        if "GP" not in endings and cat.startswith(THIRD) and GENITIVE.search(endings.get("GS", "")):
+            # a third declension genitive plural is the genitive singular's
+            # stem and -ων (Αἰθιόπων, ἰχθύων)
+            endings["GP"] = GENITIVE.sub("ων", endings["GS"])
+        if cat.startswith("n-3d") and endings.get("GS", "").endswith("ους"):
+            # so is a contracted one (ἔθνους, ἐθνῶν)
+            endings["GP"] = endings["GS"][:-3] + "ων"
+        if gender == "N":
+            for same in [("NS", "AS", "VS"), ("NP", "AP", "VP")]:
+                found = [endings[case_number] for case_number in same if case_number in endings]
+                for case_number in same:
+                    if found:
+                        endings[case_number] = found[0]
+        if "VS" not in endings and "NS" in endings:
+            endings["VS"] = endings["NS"]
+        if "NP" in endings:
+            endings["VP"] = endings["NP"]
+        return endings
+
+    def cells(self, lemma, metadata):
+        """
+        yield (gender, noun class, theme length, case_number, form) for each
+        cell generated for lemma. The form's first theme length characters
+        are its theme.
+
+        Nouns only take the genders dodson-pos gives them (where it gives
+        any).
+        """
+        folded = fold(lemma)
+        unaccented = strip_accents(lemma)
+        if len(unaccented) != len(folded):
+            unaccented = folded
+        cats = [
+            next((sub for ending, sub in SUBCLASSES.get(cat, []) if folded.endswith(ending)), cat)
+            for cat in morphcats(metadata)
+        ]
+        adjective = any(cat.startswith("a") for cat in cats)
+        suffix = next((FEMININE_SUFFIXES[cat] for cat in cats if cat in FEMININE_SUFFIXES), "")
+        found = nominal_themes(folded, dict(metadata, **{"mounce-morphcat": cats}), self.citation)
+        genders = "" if adjective else dodson_genders(metadata)
+        if genders and not any(gender in genders for theme, gender, cat in found):
+            # a noun whose class has no endings of its own for its gender
+            # declines like the class's (ἡ παρθένος like ὁ λόγος)
+            found = [(theme, gender, cat, genders[0]) for theme, gender, cat in found]
+        else:
+            found = [
+                (theme, gender, cat, gender) for theme, gender, cat in found
+                if not genders or gender in genders
+            ]
+        themes = {}
+        for theme, gender, cat, label in found:
+            base = unaccented[:len(theme)]
+            suffixed = bool(suffix) and label == "F" and cat.startswith(FIRST_SECOND[:2])
+            if suffixed:
+                theme += suffix
+                base += suffix
+            entry = themes.setdefault((theme, cat), (base, suffixed, {}))
+            entry[2][label] = self.endings_for(folded, theme, cat, gender)
+        if adjective:
+            # the neuter's genitive and dative are the masculine's, and so is
+            # the whole feminine of an adjective of two terminations
+            masculine = {
+                theme: by_gender["M"] for (theme, cat), (base, suffixed, by_gender) in themes.items()
+                if "M" in by_gender
+            }
+            for (theme, cat), (base, suffixed, by_gender) in themes.items():
+                for gender, same, source in [
+                    ("N", OBLIQUE, masculine.get(theme, {})), ("F", CASE_NUMBERS, by_gender.get("M", {}))
+                ]:
+                    for case_number in same:
+                        if gender in by_gender and case_number in source:
+                            by_gender[gender].setdefault(case_number, source[case_number])
+        for (theme, cat), (base, suffixed, by_gender) in sorted(themes.items()):
+            for gender, endings in sorted(by_gender.items()):
+                for case_number in CASE_NUMBERS:
+                    if case_number not in endings:
+                        continue
+                    form = base + endings[case_number]
+                    if not base:
+                        # keep the breathing of a lemma that is all ending
+                        # (ὗς)
+                        form = unaccented[:1] + form[1:]
+                    form = accentuate(form, lemma, case_number, cat, adjective, suffixed)
+                    yield gender, cat, len(theme), case_number, form
+
+    def paradigm(self, lemma, metadata):
+        """
+        return gender -> case_number -> sorted forms generated for lemma.
+        """
+        paradigm = {}
+        for gender, cat, theme_length, case_number, form in self.cells(lemma, metadata):
+            paradigm.setdefault(gender, {}).setdefault(case_number, set()).add(form)
+        return {
+            gender: {case_number: sorted(forms) for case_number, forms in cells.items()}
+            for gender, cells in paradigm.items()
+        }
+
+
+def degree(lemma):
+    """
+    return the degree (ccat-parse's - C or S) of an adjective lemma.
+    """
+    folded = fold(lemma)
+    if COMPARATIVE.search(folded):
+        return "C"
+    if SUPERLATIVE.search(folded):
+        return "S"
+    return "-"
+
+
+def graded_forms():
+    """
+    return the (lemma, norm) pairs of the text that are comparatives or
+    superlatives of a lemma that isn't (νεώτεροι of νέος), which forms.yaml
+    lists with the lemma's own forms.
+    """
+    table = sblgnt.corpus()
+    lemmas, norms, parses = table["lemma"], table["norm"], table["ccat-parse"]
+    graded = {code for code, parse in enumerate(parses.values) if parse[7] in "CS"}
+    pairs = set()
+    for lemma_code, norm_code, parse_code in zip(lemmas.codes, norms.codes, parses.codes):
+        if parse_code in graded:
+            lemma = lemmas.values[lemma_code]
+            if parses.values[parse_code][7] != degree(lemma):
+                pairs.add((lemma, norms.values[norm_code]))
+    return pairs
+
+
+def attested_forms(forms, lemma, gender, case_number, excluded=()):
+    """
+    return the forms of forms.yaml for the cell, or [] if it is unattested,
+    leaving out those whose (lemma, form) is in excluded (as graded_forms
+    gives them, a movable ν in the text either way).
+    """
+    cell = forms.get(lemma, {}).get(gender, {}).get(case_number)
+    if not cell:
+        return []
+    return [
+        item["form"] for item in cell.get("forms", [])
+        if not any(
+            (lemma, item["form"].replace("(ν)", nu)) in excluded for nu in ["", "ν"]
+        )
+    ]
+
+
+def load(nominal_endings=NOMINAL_ENDINGS):
+    return Generator(parse_nominal_endings(nominal_endings))
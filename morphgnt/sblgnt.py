@@ -0,0 +1,61 @@
+"""
+the MorphGNT/SBLGNT text of py-sblgnt, parsed once per installed version of
+the package into a columnar table (see morphgnt.columns) and memory-mapped
+from the cache after that.
+
+morphgnt_rows is a drop-in replacement for pysblgnt.morphgnt_rows.
+"""
+
+import pysblgnt
+
+from .columns import Table, cached_table
+from .filesets import FIELDS
+
+
+BOOKS = range(1, 28)
+
+corpus_table = None
+
+
+def package_version():
+    try:
+        from importlib.metadata import version
+        return version("py-sblgnt")
+    except Exception:
+        return getattr(pysblgnt, "__version__", None)
+
+
+def build():
+    table = Table(FIELDS)
+    starts = []
+    for book_num in BOOKS:
+        starts.append(len(table))
+        table.extend([row[name] for name in FIELDS] for row in pysblgnt.morphgnt_rows(book_num))
+    table.meta["books"] = starts + [len(table)]
+    return table
+
+
+def corpus():
+    """
+    return the whole text as a Table, its meta["books"] giving the row each
+    book starts at (and, last, the number of rows).
+    """
+    global corpus_table
+    if corpus_table is None:
+        corpus_table = cached_table("sblgnt", [], build, key=("py-sblgnt", package_version()))
+    return corpus_table
+
+
+def book_range(book_num):
+    """
+    return the (start, stop) rows of the given book number.
+    """
+    books = corpus().meta["books"]
+    return books[book_num - 1], books[book_num]
+
+
+def morphgnt_rows(book_num):
+    """
+    yield a dict for each MorphGNT/SBLGNT row in the given book number.
+    """
+    return corpus().rows(*book_range(book_num))
@@ -0,0 +1,133 @@
+"""
+substring search over the normalized forms of a fileset.
+
+The suffixes of every distinct form of the norm column (or of a variant of
+it with accents or breathing stripped) are sorted into a suffix array of
+(form, offset) pairs. All the suffixes starting with a query are then
+adjacent, and two binary searches of O(m log n) comparisons find them.
+Suffixes stop at the end of their form, so a match never runs from one
+token into the next. Which tokens have a form is kept as a concordance
+(see morphgnt.concordance) of the variant column, which gives token counts
+and positions.
+
+The array is cached next to the fileset's own table.
+"""
+
+from array import array
+
+from .columns import cached_file
+from .concordance import Concordance
+from .concordance import build as build_concordance
+from .fuzzy import fold
+from .utils import strip_accents
+
+
+# bumped whenever what build() stores changes
+VERSION = 2
+
+VARIANTS = {
+    "norm": None,
+    "unaccented": strip_accents,
+    "folded": fold,
+}
+
+# sorts after any character a form can contain
+HIGHEST = chr(0x10FFFF)
+
+
+def build(column, variant):
+    """
+    return the header and chunks of the suffix array of column (normalized
+    as variant).
+    """
+    function = VARIANTS[variant]
+    if function is not None:
+        column = column.map(function)
+    suffixes = sorted(
+        (value[offset:], code, offset)
+        for code, value in enumerate(column.values)
+        for offset in range(len(value))
+    )
+    codes = array("I", [code for suffix, code, offset in suffixes])
+    offsets = array("B", [offset for suffix, code, offset in suffixes])
+    header, chunks = build_concordance(column, variant)
+    return {"variant": variant, "concordance": header}, [codes, offsets] + chunks
+
+
+class SuffixArray(object):
+
+    def __init__(self, table, header, chunks):
+        self.variant = header["variant"]
+        self.function = VARIANTS[self.variant]
+        self.codes, self.offsets = chunks[:2]
+        self.concordance = Concordance(table, header["concordance"], chunks[2:])
+        self.values = header["concordance"]["values"]
+
+    def suffix(self, i):
+        return self.values[self.codes[i]][self.offsets[i]:]
+
+    def lower(self, query):
+        """
+        return the first entry whose suffix isn't less than query.
+        """
+        lo, hi = 0, len(self.codes)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.suffix(mid) < query:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def span(self, query, start=False, end=False):
+        """
+        return the entries (as a range) whose suffix starts with query, or
+        (if end) is query, and which (if start) begin their form.
+        """
+        if self.function is not None:
+            query = self.function(query)
+        first = self.lower(query)
+        last = self.lower(query + ("\0" if end else HIGHEST))
+        entries = range(first, last)
+        if start:
+            entries = [i for i in entries if self.offsets[i] == 0]
+        return entries
+
+    def types(self, query, start=False, end=False):
+        """
+        return the distinct forms containing query (beginning or ending
+        with it if start or end), in order.
+        """
+        return sorted({self.values[self.codes[i]] for i in self.span(query, start, end)})
+
+    def count(self, query, start=False, end=False):
+        """
+        return the number of tokens whose form contains query (as in types).
+        """
+        return sum(self.concordance.count(form) for form in self.types(query, start, end))
+
+    def locate(self, query, start=False, end=False):
+        """
+        return the positions of the tokens whose form contains query (as in
+        types), in order.
+        """
+        return sorted(
+            position
+            for form in self.types(query, start, end)
+            for position in self.concordance.positions(form)
+        )
+
+
+def load(fileset, variant="norm"):
+    """
+    return the (cached) suffix array of the norm column of fileset.
+    """
+    if variant not in VARIANTS:
+        raise ValueError("unknown variant {}".format(variant))
+    table = fileset.table()
+    header, chunks = cached_file(
+        "suffixes-{}-{}".format(fileset.setname, variant), ".suffixes",
+        list(fileset.files()), lambda: build(table["norm"], variant),
+        key=(fileset.metadata.get("format"), fileset.columns(), VERSION),
+    )
+    return SuffixArray(table, header, chunks)
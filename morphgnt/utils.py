@@ -1,3 +1,4 @@
+import re
 import unicodedata
 import yaml
 
@@ -24,10 +25,112 @@ def nfkc_normalize(s):
     return unicodedata.normalize("NFKC", s)
 
 
+ACUTE = "\u0301"
+GRAVE = "\u0300"
+CIRCUMFLEX = "\u0342"
+SMOOTH = "\u0313"
+ROUGH = "\u0314"
+
+
+def strip_accents(s):
+    return unicodedata.normalize("NFC", "".join(
+        c for c in unicodedata.normalize("NFD", s) if c not in (ACUTE, GRAVE, CIRCUMFLEX)
+    ))
+
+
+def strip_breathing(s):
+    return unicodedata.normalize("NFC", "".join(
+        c for c in unicodedata.normalize("NFD", s) if c not in (SMOOTH, ROUGH)
+    ))
+
+
+# breathing marks spelt out, the rough one as an h (on the second vowel of a
+# diphthong). decompose_breathing replaces them in one pass, which gives
+# what replacing them one after another in this order would only for words
+# with at most one breathing, as every NT form is: in a chain the ο left by
+# ὁ -> hο is matched again by οὑ and οὐ (ὁὑ gives hhου chained, hοhυ in one
+# pass).
+
+BREATHING_DECOMPOSITIONS = {
+    "ἡ": "hη",
+    "ὁ": "hο",
+    "οὑ": "hου",
+    "οἱ": "hοι",
+    "αἱ": "hαι",
+    "εἱ": "hει",
+    "ἁ": "hα",
+    "ἑ": "hε",
+    "ὡ": "hω",
+    "ὑ": "hυ",
+    "ᾑ": "hῃ",
+    "ᾡ": "hῳ",
+    "οὐ": "ου",
+    "ὠ": "ω",
+    "ὀ": "ο",
+    "ἀ": "α",
+}
+
+BREATHING_REGEX = re.compile("|".join(
+    re.escape(s) for s in sorted(BREATHING_DECOMPOSITIONS, key=len, reverse=True)
+))
+
+decomposed_breathing = {}
+
+
+def decompose_breathing(s):
+    """
+    return the unaccented s with its breathing marks spelt out (ἡμέρα ->
+    hημερα once unaccented), in one pass over s and once per distinct s.
+    """
+    try:
+        return decomposed_breathing[s]
+    except KeyError:
+        decomposed = BREATHING_REGEX.sub(lambda match: BREATHING_DECOMPOSITIONS[match.group()], s)
+        decomposed_breathing[s] = decomposed
+        return decomposed
+
+
+def decompose_breathing_batch(forms):
+    """
+    return decompose_breathing of each of forms.
+    """
+    return [decompose_breathing(s) for s in forms]
+
+
 def sorted_items(d):
     return sorted(d.items(), key=lambda x: collator.sort_key(x[0]))
 
 
+LEXEME_FIELDS = [
+    "pos",
+    "full-citation-form",
+    "bdag-headword",
+    "danker-entry",
+    "dodson-entry",
+    "mounce-headword",
+    "strongs",
+    "gk",
+    "dodson-pos",
+    "gloss",
+    "mounce-morphcat",
+]
+
+
+def print_lexemes(lexemes, file=None):
+    """
+    print lexemes in the layout of lexemes.yaml (collated, known fields in
+    their usual order followed by any others).
+    """
+    for lexeme, metadata in sorted_items(lexemes):
+        print("{}:".format(lexeme), file=file)
+        for name in LEXEME_FIELDS:
+            if name in metadata:
+                print("    {}: {}".format(name, metadata[name]), file=file)
+        for name, value in metadata.items():
+            if name not in LEXEME_FIELDS:
+                print("    {}: {}".format(name, value), file=file)
+
+
 def stemmer(form, end_rule):
     if ">" in end_rule and "<" in end_rule:
         if "|" in end_rule[:end_rule.find(">")]:
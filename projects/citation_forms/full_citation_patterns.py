@@ -1,14 +1,16 @@
 #!/usr/bin/env python3
 
+from collections import defaultdict
 import re
+import sys
+import time
 import unicodedata
 
+from morphgnt.cache import cached
 from morphgnt.utils import load_yaml, sorted_items
 
 from citation_form_data import CITATION_FORMS
 
-lexemes = load_yaml("../../lexemes.yaml")
-
 ACUTE = u"\u0301"
 GRAVE = u"\u0300"
 CIRCUMFLEX = u"\u0342"
@@ -176,71 +178,135 @@ def r(s):
     return s
 
 
-fail_count = 0
-
-for lexeme, metadata in sorted_items(lexemes):
-    pos = metadata.get("pos")
-    full_citation = metadata.get("full-citation-form")
-    dodson_pos = DODSON_OVERRIDES.get(lexeme, metadata.get("dodson-pos", ""))
-    mounce_morphcat = MOUNCE_OVERRIDES.get(
-        lexeme, metadata.get("mounce-morphcat", ""))
-
-    if full_citation is None:
-        continue
-
-    if (
-        (pos == "N") or
-        (dodson_pos and dodson_pos.startswith("N")) or
-        (
-            isinstance(mounce_morphcat, str) and
-            mounce_morphcat.startswith("n")
-        ) or (
-            isinstance(mounce_morphcat, list) and
-            any(x.startswith("n") for x in mounce_morphcat)
-        ) or
-        (pos == "A") or
-        (dodson_pos and dodson_pos == "A") or
-        (
-            isinstance(mounce_morphcat, str) and
-            mounce_morphcat.startswith("a-")
-        ) or (
-            isinstance(mounce_morphcat, list) and
-            any(x.startswith("a-") for x in mounce_morphcat)
+# a node of the compiled tree is (children by final token, children that
+# could have any final token) or None for a leaf; a child is
+# (order, key, end regex, cat regex, dodson regex, node)
+
+ANY = None
+
+LITERAL_ALTERNATION = re.compile(r"\(([^\\()\[\]{}.*+?^$]+)\)")
+METACHARACTERS = re.compile(r"[\\()\[\]{}.*+?^$|]")
+
+
+def final_tokens(end):
+    """
+    return the final tokens (after the last space) a citation must have to
+    match the expanded end pattern, or ANY if the pattern doesn't pin them
+    down.
+    """
+    if " " not in end or not end.endswith("$"):
+        return ANY
+    tail = end.rsplit(" ", 1)[1][:-1]
+    alternation = LITERAL_ALTERNATION.fullmatch(tail)
+    if alternation:
+        return alternation.group(1).split("|")
+    if METACHARACTERS.search(tail):
+        return ANY
+    return [tail]
+
+
+def compile_tree(node):
+    """
+    expand the templates of and compile the regexes in a CITATION_FORMS
+    tree, indexing the children of each node by the final token of the
+    citations they can match.
+    """
+    if not node:
+        return None
+    by_token = defaultdict(list)
+    anywhere = []
+    for order, ((end, cat, dodson), key, children) in enumerate(node):
+        end = r(end)
+        child = (order, key, re.compile(end), re.compile(cat), re.compile(dodson), compile_tree(children))
+        tokens = final_tokens(end)
+        if tokens is ANY:
+            anywhere.append(child)
+        else:
+            for token in tokens:
+                by_token[token].append(child)
+    return dict(by_token), anywhere
+
+
+def classify(tree, citation, mounce_morphcat, dodson_pos):
+    """
+    follow the (accent-stripped) citation down the compiled tree.
+
+    Returns (path, matches): the keys of the nodes matched on the way and,
+    if it didn't reach a leaf, the keys of the 0 or 2+ children matching
+    where it stopped.
+    """
+    token = citation.rsplit(" ", 1)[-1]
+    path = []
+    node = tree
+    while node:
+        by_token, anywhere = node
+        success = sorted(
+            child for child in by_token.get(token, []) + anywhere
+            if child[2].search(citation) and child[3].search(mounce_morphcat) and child[4].search(dodson_pos)
         )
-    ):
+        if len(success) != 1:
+            return path, [child[1] for child in success]
+        path.append(success[0][1])
+        node = success[0][5]
+    return path, None
+
+
+def main():
+    start = time.time()
+    lexemes = cached("lexemes", ["../../lexemes.yaml"], lambda: load_yaml("../../lexemes.yaml"))
+    loaded = time.time()
+
+    tree = compile_tree(CITATION_FORMS)
+    fail_count = 0
+    ambiguous_count = 0
+
+    for lexeme, metadata in sorted_items(lexemes):
+        pos = metadata.get("pos")
+        full_citation = metadata.get("full-citation-form")
+        dodson_pos = DODSON_OVERRIDES.get(lexeme, metadata.get("dodson-pos", ""))
+        mounce_morphcat = MOUNCE_OVERRIDES.get(
+            lexeme, metadata.get("mounce-morphcat", ""))
+
+        if full_citation is None:
+            continue
 
         if isinstance(mounce_morphcat, list):
-            mounce_morphcat = ";".join(mounce_morphcat)
-
-        node = CITATION_FORMS
-
-        level = 1
-        while node:
-            success = []
-            for child in node:
-                match_tuple, key, children = child
-                end, cat, dodson = match_tuple
-                end = r(end)
-                # print("trying {}".format(key))
-                if (
-                    re.search(end, strip_accents(full_citation)) and
-                    re.search(cat, mounce_morphcat) and
-                    re.search(dodson, dodson_pos)
-                ):
-                    success.append((key, children))
-            if len(success) != 1:
-                if fail_count == 0:
-                    print(lexeme)
-                    print(full_citation)
-                    print()
-                    print("    ((r\"^{}$\"".format(strip_accents(full_citation).replace(".", r"\.")), end=", ")
-                    print("r\"^{}$\"".format(mounce_morphcat.replace("(", r"\(").replace(")", r"\)")), end=", ")
-                    print("r\"^{}$\"), \"\", []),".format(dodson_pos))
-                    print()
-                    print("found {} matches at level {} {}".format(len(success), level, key))
-                fail_count += 1
-                break
-            node = success[0][1]
-            level += 1
-
-print(fail_count)
+            cats = mounce_morphcat
+        else:
+            cats = [mounce_morphcat]
+
+        nominal_dodson = bool(dodson_pos) and (dodson_pos.startswith("N") or dodson_pos == "A")
+        nominal_mounce = any(x.startswith("n") or x.startswith("a-") for x in cats)
+        if pos not in ["N", "A"] and not nominal_dodson and not nominal_mounce:
+            continue
+
+        mounce_morphcat = ";".join(cats)
+        citation = strip_accents(full_citation)
+
+        path, matches = classify(tree, citation, mounce_morphcat, dodson_pos)
+        if matches is None:
+            continue
+
+        fail_count += 1
+        if matches:
+            ambiguous_count += 1
+        print(lexeme)
+        print(full_citation)
+        print()
+        print("    ((r\"^{}$\"".format(citation.replace(".", r"\.")), end=", ")
+        print("r\"^{}$\"".format(mounce_morphcat.replace("(", r"\(").replace(")", r"\)")), end=", ")
+        print("r\"^{}$\"), \"\", []),".format(dodson_pos))
+        print()
+        print("found {} matches at level {} {}".format(len(matches), len(path) + 1, " / ".join(path)))
+        if matches:
+            print("    " + ", ".join(matches))
+        print()
+
+    print(fail_count)
+    print("{} failures ({} ambiguous) classified in {:.0f}ms (lexemes loaded in {:.1f}s)".format(
+        fail_count, ambiguous_count, (time.time() - loaded) * 1000, loaded - start
+    ), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+
+"""
+generate the full-citation-form of nouns and adjectives from their
+paradigms and mounce-morphcat and diff them against lexemes.yaml.
+
+Nouns are cited as nominative, genitive ending and article(s)
+(λόγος, ου, ὁ), adjectives as the masculine nominative and the endings of
+the other genders (ἀγαθός, ή, όν or ἀγαθοποιός, όν) and indeclinable
+nouns as the lemma and article (Ἀαρών, ὁ). Cells attested in forms.yaml
+are preferred to generated ones, leaving out comparatives and superlatives
+it lists with their positive. A genitive whose stem isn't the lemma's is
+cited in full (ἀνήρ, ἀνδρός, ὁ).
+
+Cited endings keep the accent of the form they are cut from, as the stored
+citation forms mostly do (ἀγαθός, ή, όν); --unaccented leaves out an
+accent that is only the lemma's again (αἰσχροκερδής, ες).
+"""
+
+import argparse
+from collections import Counter
+import sys
+import time
+
+from accentuation import get_accent_type
+
+from morphgnt import paradigms
+from morphgnt.cache import cached
+from morphgnt.fuzzy import fold
+from morphgnt.utils import load_yaml, sorted_items, strip_accents
+
+
+ARTICLES = {"M": "ὁ", "F": "ἡ", "N": "τό"}
+
+VOWELS = "αεηιουωϊϋ"
+
+
+class CitationTemplates(object):
+    """
+    the shape of the citation form of each mounce-morphcat, worked out once
+    per category: the genders of its nominatives (after the lemma's) for
+    adjectives, or None for nouns.
+    """
+
+    def __init__(self):
+        self.templates = {}
+
+    def template(self, cats):
+        key = tuple(cats)
+        if key not in self.templates:
+            if all(cat.startswith("n") for cat in cats):
+                template = None
+            elif any(cat in ["a-3a", "a-4a", "a-4b(1)"] for cat in cats):
+                # two terminations
+                template = ["N"]
+            else:
+                template = ["F", "N"]
+            self.templates[key] = template
+        return self.templates[key]
+
+
+def ending(form, theme_length, lemma, unaccented=False):
+    """
+    return the ending of form as cited: what follows its theme, from the
+    theme's last vowel if it would otherwise start with a consonant (ῶνος,
+    ητος, ατρός, ιγγος but ου, ας), which for a stem that changes is the
+    whole form (ἀνδρός). If unaccented, an ending accented as the lemma is
+    (on the same syllable from the end, with the same accent) is left
+    unaccented.
+    """
+    start = theme_length
+    if start < len(form) and fold(form[start]) not in VOWELS:
+        while start > 0 and fold(form[start - 1]) not in VOWELS:
+            start -= 1
+        start = max(start - 1, 0)
+    if unaccented and get_accent_type(form) == get_accent_type(lemma):
+        return strip_accents(form[start:])
+    return form[start:]
+
+
+def nominative_and_genitive(cells, forms, lemma, excluded=()):
+    """
+    return gender -> (theme length, {case_number: form}) for the singular
+    nominative and genitive, preferring attested forms with the generated
+    form's theme (but for those whose (lemma, form) is in excluded).
+    """
+    found = {}
+    for gender, cat, theme_length, case_number, form in cells:
+        if case_number not in ["NS", "GS"]:
+            continue
+        theme = fold(form[:theme_length])
+        attested = [
+            other for other in paradigms.attested_forms(forms, lemma, gender, case_number, excluded)
+            if fold(other[:theme_length]) == theme
+        ]
+        if attested:
+            form = attested[0]
+        found.setdefault(gender, (theme_length, {}))[1].setdefault(case_number, form)
+    return found
+
+
+def citation_form(generator, templates, forms, lemma, metadata, excluded=(), unaccented=False):
+    """
+    return the generated citation form of lemma, or None.
+    """
+    cats = metadata.get("mounce-morphcat")
+    if cats is None:
+        return None
+    if not isinstance(cats, list):
+        cats = [cats]
+
+    if all(cat.startswith("n-3g") for cat in cats):
+        dodson_pos = metadata.get("dodson-pos", "")
+        genders = [g for g in dodson_pos.partition(":")[2] if g in ARTICLES]
+        if not genders:
+            return None
+        return "{}, {}".format(lemma, "/".join(ARTICLES[g] for g in genders))
+
+    by_gender = nominative_and_genitive(generator.cells(lemma, metadata), forms, lemma, excluded)
+    if not by_gender:
+        return None
+
+    template = templates.template(cats)
+    if template is None:
+        genders = [g for g in paradigms.GENDERS if g in by_gender and "GS" in by_gender[g][1]]
+        # many third declension classes take more than one gender
+        dodson_genders = [g for g in genders if g in metadata.get("dodson-pos", "").partition(":")[2]]
+        adjective = str(metadata.get("pos", "")).split("/")[0] == "A" and all(
+            cat.startswith(paradigms.THIRD) for cat in cats
+        )
+        if dodson_genders:
+            genders = dodson_genders
+        elif adjective:
+            # a third declension adjective of one ending (ἀμήτωρ, ορος) has
+            # the genders it is attested in, and no article
+            genders = [g for g in genders if g in forms.get(lemma, {})]
+        if not genders:
+            return None
+        theme_length, cells = by_gender[genders[0]]
+        parts = [lemma, ending(cells["GS"], theme_length, lemma, unaccented)]
+        if dodson_genders or not adjective:
+            parts.append("/".join(ARTICLES[g] for g in genders))
+        return ", ".join(parts)
+
+    # the feminine is cited from its suffix (πᾶς, ασα; βαρύς, εῖα)
+    suffix = next((paradigms.FEMININE_SUFFIXES[cat] for cat in cats if cat in paradigms.FEMININE_SUFFIXES), "")
+    parts = [lemma]
+    for gender in template:
+        if gender not in by_gender or "NS" not in by_gender[gender][1]:
+            return None
+        theme_length, cells = by_gender[gender]
+        if gender == "F" and cells["NS"] == lemma:
+            # a class of two or three terminations whose lemma has two
+            # (αἰώνιος, ον)
+            continue
+        if gender == "F":
+            theme_length -= len(suffix)
+        parts.append(ending(cells["NS"], theme_length, lemma, unaccented))
+    return ", ".join(parts)
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--all", action="store_true", help="print every generated citation form")
+    argparser.add_argument("--unaccented", action="store_true", help="leave out endings' accents the lemma shows")
+    args = argparser.parse_args()
+
+    start = time.time()
+    lexemes = cached("lexemes", ["../../lexemes.yaml"], lambda: load_yaml("../../lexemes.yaml"))
+    forms = cached("forms", ["../../forms.yaml"], lambda: load_yaml("../../forms.yaml"))
+    loaded = time.time()
+
+    generator = paradigms.load("../nominal_distinguishers/nominal_endings.yaml")
+    templates = CitationTemplates()
+    excluded = paradigms.graded_forms()
+    counts = Counter()
+
+    for lexeme, metadata in sorted_items(lexemes):
+        if str(metadata.get("pos", "")).split("/")[0] not in ["N", "A"]:
+            continue
+        stored = metadata.get("full-citation-form")
+        generated = citation_form(generator, templates, forms, lexeme, metadata, excluded, args.unaccented)
+        if generated is None:
+            counts["not generated"] += 1
+        elif stored is None:
+            counts["not stored"] += 1
+        elif generated == stored:
+            counts["same"] += 1
+        elif stored.startswith(generated + ", gen. "):
+            counts["same but for the genitive"] += 1
+        else:
+            counts["different"] += 1
+            print("{}\n    stored:    {}\n    generated: {}".format(lexeme, stored, generated))
+            continue
+        if args.all and generated is not None:
+            print("{}\n    generated: {}".format(lexeme, generated))
+
+    print(", ".join("{} {}".format(count, name) for name, count in sorted(counts.items())), file=sys.stderr)
+    print("generated and compared in {:.0f}ms (lexemes loaded in {:.1f}s)".format(
+        (time.time() - loaded) * 1000, loaded - start
+    ), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
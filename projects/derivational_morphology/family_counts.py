@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+"""
+rank derivational families by how many tokens of each book they cover.
+
+A family is a lexeme (or derivational element like "ἀ- priv.") together with
+everything in derivation.yaml that is transitively derived from it.
+
+Run from the repository root. Results are cached and rebuilt whenever
+derivation.yaml or the fileset changes.
+"""
+
+import argparse
+from collections import Counter, defaultdict
+import os.path
+
+from morphgnt import filesets
+from morphgnt.cache import cached
+from morphgnt.utils import load_yaml
+
+
+# bumped whenever what compute_family_totals() returns changes
+VERSION = 2
+
+
+def children_by_parent(derivation):
+    children = defaultdict(set)
+    for lexeme, metadata in derivation.items():
+        for parent in (metadata or {}).get("derivation", []):
+            children[parent].add(lexeme)
+    return children
+
+
+def family_members(nodes, children):
+    """
+    return node -> frozenset of node and all its descendants, for each of
+    nodes and everything derived from them.
+
+    Each node is visited once (iterative post-order with memoization) so
+    shared descendants in the DAG are not rescanned. Cycles in the data are
+    broken at the back edge.
+    """
+    members = {}
+    in_progress = set()
+    for start in nodes:
+        if start in members:
+            continue
+        stack = [(start, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in members:
+                continue
+            if expanded:
+                in_progress.discard(node)
+                family = {node}
+                for child in children.get(node, ()):
+                    family |= members.get(child, {child})
+                members[node] = frozenset(family)
+            else:
+                in_progress.add(node)
+                stack.append((node, True))
+                for child in children.get(node, ()):
+                    if child not in members and child not in in_progress:
+                        stack.append((child, False))
+    return members
+
+
+def book_names(fileset):
+    # e.g. 61-Mt-morphgnt.txt is book 01 (Mt)
+    names = {}
+    for filename in fileset.files():
+        num, name = os.path.basename(filename).split("-")[:2]
+        names["{:02d}".format(int(num) - 60)] = name
+    return names
+
+
+def lemma_counts_by_book(fileset):
+    counts = defaultdict(Counter)
+    for row in fileset.rows():
+        counts[row["bcv"][:2]][row["lemma"]] += 1
+    return counts
+
+
+def compute_family_totals(derivation, fileset):
+    """
+    return (book -> (book tokens, list of (family, tokens, attested members)
+    ranked by tokens descending), roots) where roots are the families not
+    themselves derived from anything.
+    """
+    children = children_by_parent(derivation)
+    members = family_members(list(derivation) + list(children), children)
+    derived = {child for kids in children.values() for child in kids}
+    roots = {node for node in members if node not in derived}
+
+    names = book_names(fileset)
+    totals = {}
+    for book, counts in sorted(lemma_counts_by_book(fileset).items()):
+        ranked = []
+        for family, family_set in members.items():
+            tokens = 0
+            attested = 0
+            for member in family_set:
+                count = counts.get(member)
+                if count:
+                    tokens += count
+                    attested += 1
+            if tokens:
+                ranked.append((family, tokens, attested))
+        ranked.sort(key=lambda x: (-x[1], x[0]))
+        totals[names.get(book, book)] = (sum(counts.values()), ranked)
+    return totals, roots
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--fileset", default="sblgnt-lexemes")
+    argparser.add_argument("--top", type=int, default=20)
+    argparser.add_argument("--book", help="only report this book (e.g. Jn)")
+    argparser.add_argument("--all", action="store_true", help="include non-root families")
+    args = argparser.parse_args()
+
+    fileset = filesets.load("filesets.yaml")[args.fileset]
+
+    totals, roots = cached(
+        "family_counts-" + args.fileset,
+        ["derivation.yaml"] + list(fileset.files()),
+        lambda: compute_family_totals(load_yaml("derivation.yaml"), fileset),
+        key=VERSION,
+    )
+
+    for book, (book_tokens, ranked) in totals.items():
+        if args.book and book != args.book:
+            continue
+        print("{}:".format(book))
+        shown = 0
+        for family, tokens, attested in ranked:
+            if not args.all and family not in roots:
+                continue
+            print("    {} {} {:.2%} ({} lexemes)".format(
+                family, tokens, tokens / book_tokens, attested))
+            shown += 1
+            if shown == args.top:
+                break
+
+
+if __name__ == "__main__":
+    main()
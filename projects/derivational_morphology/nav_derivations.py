@@ -5,10 +5,12 @@ from difflib import ndiff
 import sys
 import unicodedata
 
+from morphgnt.lookup import LexemeIndex
 from morphgnt.utils import load_yaml, sorted_items
 
 derivation = load_yaml("derivation.yaml")
 lexemes = load_yaml("lexemes.yaml")
+index = LexemeIndex(lexemes)
 
 
 def strip_accents(s):
@@ -73,6 +75,8 @@ for lexeme, metadata in sorted_items(lexemes):
             if "derivation" in derivation[lexeme]:
                 if len(derivation[lexeme]["derivation"]) == 1:
                     other = derivation[lexeme]["derivation"][0]
+                    # tolerate case and accent variants
+                    other = index.resolve_unique(other, "accents") or other
                     if other in lexemes:
                         pos1 = lexemes[lexeme]["pos"]
                         pos2 = lexemes[other]["pos"]
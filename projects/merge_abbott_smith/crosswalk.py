@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+"""
+cross-walk abbott_smith_headwords.txt to lexemes.yaml via Strong's numbers.
+
+For each Abbott-Smith entry, prints its lemma, G-numbers and the lexemes
+those numbers map to, flagging entries whose lemma is among them only up to
+case, accents and breathing (~) or not at all (@@@).
+"""
+
+import re
+import sys
+
+from morphgnt.lookup import normalization_keys, number_index
+
+
+index = number_index("../../lexemes.yaml")
+
+with open("abbott_smith_headwords.txt") as f:
+    text = f.read()
+
+ENTRY_REGEX = re.compile(r"^([^|\n]*)\|([^|\n]*)\|", re.MULTILINE)
+NUMBER_REGEX = re.compile(r"G(\d+)")
+
+matched = 0
+variants = 0
+mismatched = 0
+unnumbered = 0
+
+for lemma, refs in ENTRY_REGEX.findall(text):
+    numbers = [int(g) for g in NUMBER_REGEX.findall(refs)]
+    if not numbers:
+        unnumbered += 1
+        continue
+    headwords = [
+        headword
+        for number in numbers
+        for headword in index.headwords_for_strongs(number)
+    ]
+    if lemma in headwords:
+        matched += 1
+        flag = ""
+    elif normalization_keys(lemma)[-1] in {normalization_keys(h)[-1] for h in headwords}:
+        variants += 1
+        flag = " ~"
+    else:
+        mismatched += 1
+        flag = " @@@" if headwords else " (no lexeme)"
+    print("{} {} {}{}".format(lemma, refs, " ".join(headwords) or "-", flag))
+
+print("{} matched; {} variants; {} mismatched; {} without G-numbers".format(
+    matched, variants, mismatched, unnumbered), file=sys.stderr)
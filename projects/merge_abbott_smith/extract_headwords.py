@@ -1,26 +1,114 @@
 #!/usr/bin/env python3
 
+"""
+stream the entries out of a TEI lexicon, printing `n|form` for each entry.
+
+Entries are read with iterparse and discarded as soon as they have been
+processed so memory use does not grow with the size of the dictionary.
+
+With --index, also write a sidecar pickle of
+
+    {
+        "entries": [(entry number, lemma, strongs numbers, headword), ...],
+        "by_lemma": {lemma: [entry number, ...]},
+        "by_strongs": {strongs number: [entry number, ...]},
+    }
+
+where the entry number is the 1-based position of the entry in the file and
+the lemma and Strong's numbers come from the entry's `n` attribute (e.g.
+`ἀβαρής|G4`).
+"""
+
+import argparse
+from collections import defaultdict
+import pickle
+import re
 import xml.etree.ElementTree as ET
 
-tree = ET.parse("abbott-smith.tei.xml")
 
-ns = {
-    "TEIOSIS": "http://www.crosswire.org/2013/TEIOSIS/namespace"
-}
+NS = "{http://www.crosswire.org/2013/TEIOSIS/namespace}"
+
+ENTRY = NS + "entry"
+FORM = NS + "form"
 
-body = tree.getroot().find("TEIOSIS:text/TEIOSIS:body", ns)
+STRONGS_REGEX = re.compile(r"G(\d+)")
 
-for entry in body.findall(".//TEIOSIS:entry", ns):
-    entry_n = entry.get("n")
-    form = entry.find("TEIOSIS:form", ns)
+
+def form_text(form):
     assert form.attrib == {}
-    if form.text:
-        s = form.text
-    else:
-        s = ""
-    for child in form.itertext():
-        s += child
+    s = "".join(form.itertext())
     assert "|" not in s
     s = s.lstrip("*† ")
     s = s.rstrip(", ")
-    print(entry_n + "|" + s)
+    return s
+
+
+def iter_entries(filename):
+    """
+    yield (entry number, n attribute, headword) for each entry element.
+    """
+    stack = []
+    num = 0
+    for event, elem in ET.iterparse(filename, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag != ENTRY:
+            continue
+        num += 1
+        form = elem.find(FORM)
+        yield num, elem.get("n"), form_text(form)
+        # detach the processed entry so the partial tree never grows
+        elem.clear()
+        if stack:
+            stack[-1].remove(elem)
+
+
+def parse_n(entry_n):
+    """
+    split an entry's `n` attribute into (lemma, list of Strong's numbers).
+    """
+    lemma, _, refs = entry_n.partition("|")
+    return lemma, [int(g) for g in STRONGS_REGEX.findall(refs)]
+
+
+def write_index(entries, filename):
+    by_lemma = defaultdict(list)
+    by_strongs = defaultdict(list)
+    for num, lemma, strongs, headword in entries:
+        by_lemma[lemma].append(num)
+        for g in strongs:
+            by_strongs[g].append(num)
+    with open(filename, "wb") as f:
+        pickle.dump({
+            "entries": entries,
+            "by_lemma": dict(by_lemma),
+            "by_strongs": dict(by_strongs),
+        }, f, pickle.HIGHEST_PROTOCOL)
+
+
+def load_index(filename):
+    with open(filename, "rb") as f:
+        return pickle.load(f)
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("tei", nargs="?", default="abbott-smith.tei.xml")
+    argparser.add_argument("--index", help="also write a sidecar index to this file")
+    args = argparser.parse_args()
+
+    entries = []
+    for num, entry_n, headword in iter_entries(args.tei):
+        print(entry_n + "|" + headword)
+        if args.index:
+            lemma, strongs = parse_n(entry_n)
+            entries.append((num, lemma, tuple(strongs), headword))
+
+    if args.index:
+        write_index(entries, args.index)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 #!/usr/bin/env python3
 
-from pysblgnt import morphgnt_rows
 from pyuca import Collator
 import yaml
 
 from characters import strip_accents
-from morphgnt.utils import load_wordset
+from morphgnt.cache import cached
+from morphgnt.categories import NounCategories
+from morphgnt.sblgnt import morphgnt_rows
+from morphgnt.utils import decompose_breathing, load_wordset, load_yaml
 
+import argparse
 from collections import defaultdict
+from multiprocessing import Pool
 import re
 import sys
 
@@ -187,413 +191,138 @@ MOUNCE_OVERRIDES = {
 }
 
 
-forms_by_lemma = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
-mounce_by_lemma = defaultdict(set)
-theme_by_lemma = defaultdict(lambda: defaultdict(set))
-
-stems_and_class_by_lemma = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
-
-with open("nominal_endings.yaml") as f:
-    noun_endings = yaml.load(f)
-
-with open("../../lexemes.yaml") as f:
-    lexemes = yaml.load(f)
-
-
-def error(message):
-    print("\x1b[31m" + message + "\x1b[0m", file=sys.stderr)
-    sys.exit(1)
-
-
-def map_non_noun_categories(mounce_cat, aspect_voice, gender, lemma):
-    new_mounce_cat = set()
-    for cat in mounce_cat:
-        if cat == "a-1a(1)":
-            cat = {
-                "M": "n-2a",
-                "F": "n-1a",
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a=1a(1)/a-3":
-            cat = {
-                "M": "n-2a",
-                "F": ["n-1a", "n-2b"],
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a-1a(2a)":
-            cat = {
-                "M": "n-2a",
-                "F": "n-1b",
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a=1a(2a-POLUS)":
-            cat = {
-                "M": "n=2a(POLUS)",
-                "F": "n-1b",
-                "N": "n=2c(POLUS)",
-            }[gender]
-        elif cat == "a=1a(2a-MEGAS)":
-            cat = {
-                "M": "n=2a(MEGAS)",
-                "F": "n-1b",
-                "N": "n=2c(MEGAS)",
-            }[gender]
-        elif cat == "a=1a(2b-HO)":
-            cat = {
-                "M": "n=2a(HO)",
-                "F": "n-1b",
-                "N": "n=2c(HO)",
-            }[gender]
-        elif cat == "a=1a(2b-HOS)":
-            cat = {
-                "M": "n-2a",
-                "F": "n-1b",
-                "N": "n=2c(HO)",
-            }[gender]
-        elif cat == "a=1a(2b-HOSb)":
-            cat = {
-                "M": "n-2a",
-                "F": "n-1b",
-                "N": ["n=2c(HO)", "n-2c"],
-            }[gender]
-        elif cat == "a-1b":
-            cat = {
-                "M": "n-2d",
-                "F": "n=1h(ETA)",
-                "N": "n-2d",
-            }[gender]
-        elif cat == "a=1b(OMICRON)":
-            cat = {
-                "M": "n=2d(OMICRON)",
-                "F": "n=1h(ETA)",
-                "N": "n=2d(OMICRON)",
-            }[gender]
-        elif cat == "a=1b(ALPHA-F)":
-            cat = {
-                "M": "n-2d",
-                "F": "n=1h(ALPHA)",
-                "N": "n-2d",
-            }[gender]
-        elif cat == "a-2a":
-            cat = {
-                "M": "n=3c(5a-ALPHA)",
-                "F": "n-1c",
-                "N": "n=3c(5a-ALPHA)",
-            }[gender]
-        elif cat == "a-2a(2)":  # made up
-            cat = {
-                "M": "n-3c(5b)",
-                "F": "n-1c",
-                "N": "n-3c(5b)",
-            }[gender]
-        elif cat == "a-2a(3)":  # made up
-            cat = {
-                "M": "n-3f(1aS)",  # made up
-                "F": "n-1c",
-                "N": "n-3f(1aS)",
-            }[gender]
-        elif cat == "a-2b":
-            cat = {
-                "M": "n-3e(5bF)",  # made up
-                "F": "n-1a",
-                "N": "n-3e(5bF)",
-            }[gender]
-        elif cat == "a-3a":
-            cat = {
-                "M": "n-2a",
-                "F": "n-2b",
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a-3b(1)":
-            cat = {
-                "M": "n-2a",
-                "F": ["n-1a", "n-2b"],
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a-3b(2)":
-            cat = {
-                "M": "n-2a",
-                "F": ["n-1b", "n-2b"],
-                "N": "n-2c",
-            }[gender]
-        elif cat == "a-4a":
-            cat = {
-                "M": "n-3d(2aA)",  # made up
-                "F": "n-3d(2aA)",
-                "N": "n-3d(2bA)",  # made up
-            }[gender]
-        elif cat == "a=4a(TREIS)":
-            cat = {
-                "M": "n-3d(2aA-TREIS)",  # made up
-                "F": "n-3d(2aA-TREIS)",
-                "N": "n-3d(2bA-TREIS)",  # made up
-            }[gender]
-        elif cat == "a-4b(1)":
-            cat = {
-                "M": "n=3f(1bA)",
-                "F": "n=3f(1bA)",
-                "N": "n=3f(1bA)",
-            }[gender]
-        elif cat == "a=4b(1-EPSILON)":
-            cat = {
-                "M": "n=3f(1bA-EPSILON)",
-                "F": "n=3f(1bA-EPSILON)",
-                "N": "n=3f(1bA-EPSILON)",
-            }[gender]
-        elif cat == "a-4b(2-TIS)":
-            cat = {
-                "M": "n-3f(TIS)",  # made up
-                "F": "n-3f(TIS)",
-                "N": "n-3f(TIS)",
-            }[gender]
-        elif cat == "a=4b(2-EIS)":
-            cat = {
-                "M": "n-3f(EIS)",  # made up
-                "F": "n-1a",
-                "N": "n-3f(EIS)",
-            }[gender]
-        elif cat.startswith("v") or cat.startswith("cv"):
-            if aspect_voice == "PA":
-                if lemma.endswith("ωμι"):
-                    cat = {
-                        "M": "n=3c(5a-OMICRON)",  # made up
-                        "F": "n-1c",
-                        "N": "n=3c(5a-OMICRON)",
-                    }[gender]
-                elif lemma.endswith("νυμι"):
-                    cat = {
-                        "M": ["n=3c(5a-UPSILON)", "n-3c(5b)"],  # made up
-                        "F": "n-1c",
-                        "N": "n=3c(5a-UPSILON)",
-                    }[gender]
-                elif lemma.endswith("ημι"):
-                    cat = {
-                        "M": ["n=3c(5a-EPSILON)", "n-3c(5b)"],  # made up
-                        "F": "n-1c",
-                        "N": "n=3c(5a-EPSILON)",
-                    }[gender]
-                elif cat in ["v-1d(2a)", "v-1d(2b)", "v-1d(3)", "cv-1d(2a)", "v-1b(4)", "cv-1d(2)", "cv-1d(2b)", "cv-1a(7)", "cv-1d(3)", "v-1d(2)"]:
-                    cat = {
-                        "M": "n=3c(5b-OU)",  # made up
-                        "F": "n-1c",
-                        "N": "n=3c(5b-OU)",
-                    }[gender]
-                elif cat in ["v-1d(1a)", "v-1d(1b)", "cv-1d(1a)", "v-1d(1)", "cv-1d(1b)"]:
-                    cat = {
-                        "M": "n=3c(5b-W)",  # made up
-                        "F": "n-1c",
-                        "N": "n=3c(5b-W)",
-                    }[gender]
-                else:
-                    cat = {
-                        "M": "n-3c(5b)",  # made up
-                        "F": "n-1c",
-                        "N": "n-3c(5b)",
-                    }[gender]
-            elif aspect_voice == "PM":
-                cat = {
-                    "M": "n-2a",
-                    "F": "n-1b",
-                    "N": "n-2c",
-                }[gender]
-            elif aspect_voice == "AA":
-                if lemma.endswith("ημι"):
-                    cat = {
-                        "M": ["n=3c(5a-EPSILON)", "n=3c(5a-1A)"],
-                        "F": "n-1c",
-                        "N": ["n=3c(5a-EPSILON)", "n=3c(5a-1A)"],
-                    }[gender]
-                elif lemma.endswith(("ωμι", "ώσκω")):
-                    cat = {
-                        "M": "n=3c(5a-OMICRON)",
-                        "F": "n-1c",
-                        "N": "n-3c(5a-AAP)",
-                    }[gender]
-                else:
-                    cat = {
-                        "M": ["n=3c(5a-1A)", "n=3c(5a-2A)"],
-                        "F": "n-1c",
-                        "N": ["n=3c(5a-1A)", "n=3c(5a-2A)"],
-                    }[gender]
-            elif aspect_voice == "AM":
-                cat = {
-                    "M": "n-2a",
-                    "F": "n-1b",
-                    "N": "n-2c",
-                }[gender]
-            elif aspect_voice == "AP":
-                cat = {
-                    "M": "n=3c(5a-EPSILON)",  # made up
-                    "F": "n-1c",
-                    "N": "n=3c(5a-EPSILON)",
-                }[gender]
-            elif aspect_voice == "XA":
-                if lemma in ["ἵστημι", "παρίστημι", "συνίστημι", "περιΐστημι", "ἐφίστημι", "ἐνίστημι", "προΐστημι"]:
-                    cat = {
-                        "M": ["n=3c(1-XAP-OMEGA)", "n-3c(1-XAP)"],  # made up
-                        "F": "n-1c",
-                        "N": ["n=3c(1-XAP-OMEGA)", "n-3c(1-XAP)"],
-                    }[gender]
-                else:
-                    cat = {
-                        "M": "n-3c(1-XAP)",  # made up
-                        "F": "n-1c",
-                        "N": "n-3c(1-XAP)",
-                    }[gender]
-            elif aspect_voice == "XM":
-                cat = {
-                    "M": "n-2a",
-                    "F": "n-1b",
-                    "N": "n-2c",
-                }[gender]
-            elif aspect_voice == "FA":
-                cat = {
-                    "M": "n-3c(5b)",
-                    "F": "n-1c",
-                    "N": "n-3c(5b)",
-                }[gender]
-            elif aspect_voice == "FM":
-                cat = {
-                    "M": "n-2a",
-                    "F": "n-1b",
-                    "N": "n-2c",
-                }[gender]
-            elif aspect_voice == "FP":
-                cat = {
-                    "M": "n-2a",
-                    "F": "n-1b",
-                    "N": "n-2c",
-                }[gender]
-            else:
-                assert False, aspect_voice
-
-        if isinstance(cat, str):
-            new_mounce_cat.add(cat)
-        else:  # list
-            for c in cat:
-                new_mounce_cat.add(c)
-
-    return new_mounce_cat
-
-
-def decompose_breathing(norm):
-    norm = norm.replace("ἡ", "hη")
-    norm = norm.replace("ὁ", "hο")
-    norm = norm.replace("οὑ", "hου")
-    norm = norm.replace("οἱ", "hοι")
-    norm = norm.replace("αἱ", "hαι")
-    norm = norm.replace("εἱ", "hει")
-    norm = norm.replace("ἁ", "hα")
-    norm = norm.replace("ἑ", "hε")
-    norm = norm.replace("ὡ", "hω")
-    norm = norm.replace("ὑ", "hυ")
-    norm = norm.replace("ᾑ", "hῃ")
-    norm = norm.replace("ᾡ", "hῳ")
-    norm = norm.replace("οὐ", "ου")
-    norm = norm.replace("ὠ", "ω")
-    norm = norm.replace("ὀ", "ο")
-    norm = norm.replace("ἀ", "α")
-
-    return norm
-
-
-for book_num in range(1, 28):
+class NominalError(Exception):
+    pass
+
+
+noun_categories = NounCategories()
+noun_endings = None
+lexemes = None
+
+
+def init(endings, lexicon):
+    global noun_endings, lexemes
+    noun_endings = endings
+    lexemes = lexicon
+
+
+def analyze_row(row):
+    """
+    return (lemma, mounce-morphcats, key, case_number, theme, form entry)
+    for a nominal row, or None for rows that are ignored.
+
+    Raises NominalError if the form can't be accounted for.
+    """
+    ccat_parse = row["ccat-parse"]
+    norm = row["norm"]
+    lemma = row["lemma"]
+
+    aspect_voice = ccat_parse[1:3]
+    case_number = ccat_parse[4:6]
+    case = ccat_parse[4]
+    gender = ccat_parse[6]
+    degree = ccat_parse[7]
+
+    if aspect_voice == "PP":
+        aspect_voice = "PM"
+    if aspect_voice == "XP":
+        aspect_voice = "XM"
+
+    if norm == "πειθοῖ(ς)":
+        norm = "πειθοῖς"  # @@@
+
+    if case == "-":
+        return None
+
+    # ignore comparatives and superlatives until we re-lemmatize them
+    if degree != "-":
+        return None  # @@@
+
+    if lemma in IGNORE_SET:
+        return None
+
+    # ignore proper nouns
+    if lemma[0].lower() != lemma[0]:
+        return None
+
+    if (norm, ccat_parse) in LEMMATIZATION_OVERRIDES:
+        lemma = LEMMATIZATION_OVERRIDES[(norm, ccat_parse)]
+
+    if lemma in LEMMA_OVERRIDE:
+        lemma = LEMMA_OVERRIDE[lemma]
+    if lemma in MOUNCE_OVERRIDES:
+        mounce_cat = MOUNCE_OVERRIDES[lemma]
+    else:
+        lexeme = lexemes[lemma]
+        try:
+            mounce_cat = lexeme["mounce-morphcat"]
+        except:
+            raise NominalError("{} has no mounce-morphcat".format(lemma))
+    if not isinstance(mounce_cat, list):
+        mounce_cat = [mounce_cat]
+
+    new_mounce_cat = noun_categories.resolve(mounce_cat, aspect_voice, gender, lemma)
+
+    orig_norm = norm
+    norm = decompose_breathing(strip_accents(norm))
+
+    success = False
+    for ending_and_class_regex in noun_endings[case_number + gender]:
+        try:
+            ending, class_regex, explanation = ending_and_class_regex.split()
+        except ValueError:
+            raise NominalError("{}\n{} {}".format(row["bcv"], case_number + gender, ending_and_class_regex))
+
+        if norm.endswith(ending.replace(".", "")):
+            success = set()
+            for cat in new_mounce_cat:
+                if re.match(class_regex, cat):
+                    success.add(cat)
+            if success:
+                break
+
+    if not success:
+        raise NominalError("{} {} {} {} {} {} {} {}".format(
+            row["bcv"], lemma, gender, case_number, mounce_cat, aspect_voice,
+            norm, " / ".join(new_mounce_cat).replace("(", "\\(").replace(")", "\\)"))
+        )
+
+    if "." in ending:
+        ending = ending[ending.find(".") + 1:]
+    theme = orig_norm[:len(orig_norm) - len(ending)]
+    if len(ending) == 0:
+        orig_ending = ""
+    else:
+        orig_ending = orig_norm[-len(ending):]
+    if aspect_voice == "--":
+        assert orig_norm == theme + orig_ending, (orig_norm, theme, orig_ending)
+        key = gender
+    else:
+        key = aspect_voice + gender
+    return (
+        lemma, mounce_cat, key, case_number, strip_accents(theme),
+        (orig_norm, theme, orig_ending, explanation, "∨".join(success)),
+    )
+
+
+def analyze_book(book_num):
+    """
+    return the analyze_row results and error messages for a book.
+    """
+    results = []
+    errors = []
     for row in morphgnt_rows(book_num):
-        ccat_pos = row["ccat-pos"]
-        ccat_parse = row["ccat-parse"]
-        norm = row["norm"]
-        lemma = row["lemma"]
-
-        aspect_voice = ccat_parse[1:3]
-        case_number = ccat_parse[4:6]
-        case = ccat_parse[4]
-        gender = ccat_parse[6]
-        degree = ccat_parse[7]
-
-        if aspect_voice == "PP":
-            aspect_voice = "PM"
-        if aspect_voice == "XP":
-            aspect_voice = "XM"
-
-        if norm == "πειθοῖ(ς)":
-            norm = "πειθοῖς"  # @@@
-
-        if case == "-":
+        try:
+            result = analyze_row(row)
+        except NominalError as e:
+            errors.append(str(e))
             continue
+        if result is not None:
+            results.append(result)
+    return results, errors
 
-        # ignore comparatives and superlatives until we re-lemmatize them
-        if degree != "-":
-            continue  # @@@
 
-        if lemma in IGNORE_SET:
-            continue
-
-        # ignore proper nouns
-        if lemma[0].lower() != lemma[0]:
-            continue
-
-        if (norm, ccat_parse) in LEMMATIZATION_OVERRIDES:
-            lemma = LEMMATIZATION_OVERRIDES[(norm, ccat_parse)]
-
-        if lemma in LEMMA_OVERRIDE:
-            lemma = LEMMA_OVERRIDE[lemma]
-        if lemma in MOUNCE_OVERRIDES:
-            mounce_cat = MOUNCE_OVERRIDES[lemma]
-        else:
-            lexeme = lexemes[lemma]
-            try:
-                mounce_cat = lexeme["mounce-morphcat"]
-            except:
-                error("{} has no mounce-morphcat".format(lemma))
-        if not isinstance(mounce_cat, list):
-            mounce_cat = [mounce_cat]
-
-        for cat in mounce_cat:
-            mounce_by_lemma[lemma].add(cat)
-
-        new_mounce_cat = map_non_noun_categories(mounce_cat, aspect_voice, gender, lemma)
-
-        orig_norm = norm
-        norm = decompose_breathing(strip_accents(norm))
-
-        success = False
-        for ending_and_class_regex in noun_endings[case_number + gender]:
-            try:
-                ending, class_regex, explanation = ending_and_class_regex.split()
-            except ValueError:
-                error("{}\n{} {}".format(row["bcv"], case_number + gender, ending_and_class_regex))
-
-            if norm.endswith(ending.replace(".", "")):
-                success = set()
-                for cat in new_mounce_cat:
-                    if re.match(class_regex, cat):
-                        success.add(cat)
-                if success:
-                    break
-
-        if not success:
-            error("{} {} {} {} {} {} {} {}".format(
-                row["bcv"], lemma, gender, case_number, mounce_cat, aspect_voice,
-                norm, " / ".join(new_mounce_cat).replace("(", "\\(").replace(")", "\\)"))
-            )
-
-        if "." in ending:
-            ending = ending[ending.find(".") + 1:]
-        theme = orig_norm[:len(orig_norm) - len(ending)]
-        if len(ending) == 0:
-            orig_ending = ""
-        else:
-            orig_ending = orig_norm[-len(ending):]
-        if aspect_voice == "--":
-            assert orig_norm == theme + orig_ending, (orig_norm, theme, orig_ending)
-            theme_by_lemma[lemma][gender].add(strip_accents(theme))
-            forms_by_lemma[lemma][gender][case_number].add((orig_norm, theme, orig_ending, explanation, "∨".join(success)))
-        else:
-            theme_by_lemma[lemma][aspect_voice + gender].add(strip_accents(theme))
-            forms_by_lemma[lemma][aspect_voice + gender][case_number].add((orig_norm, theme, orig_ending, explanation, "∨".join(success)))
-
-
-def output_yaml():
+def output_yaml(forms_by_lemma, theme_by_lemma, mounce_by_lemma):
     for k in sorted(forms_by_lemma.keys(), key=collator.sort_key):
         print("{}:".format(k))
         print("    mounce: {}".format(", ".join(sorted(mounce_by_lemma[k]))))
@@ -634,7 +363,7 @@ def output_yaml():
                                     ) for n, t, e1, e2, m in sorted(forms_by_lemma[k][aspect_voice + gender][case_number]))))
 
 
-def output_space_delimited():
+def output_space_delimited(forms_by_lemma, theme_by_lemma, mounce_by_lemma):
     for k in sorted(forms_by_lemma.keys(), key=collator.sort_key):
         col_0 = k
         col_1 = "&".join(sorted(mounce_by_lemma[k]))
@@ -675,4 +404,37 @@ def output_space_delimited():
                                 print(col_0, col_1, col_8, col_2, col_10, col_3, col_4, col_5, col_6, col_7, col_9)
 
 
-output_space_delimited()
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--processes", type=int, help="defaults to the number of CPUs")
+    args = argparser.parse_args()
+
+    with open("nominal_endings.yaml") as f:
+        endings = yaml.load(f)
+    lexicon = cached("lexemes", ["../../lexemes.yaml"], lambda: load_yaml("../../lexemes.yaml"))
+
+    forms_by_lemma = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
+    mounce_by_lemma = defaultdict(set)
+    theme_by_lemma = defaultdict(lambda: defaultdict(set))
+    errors = []
+
+    # books are merged in order whatever order they are finished in
+    with Pool(args.processes, initializer=init, initargs=(endings, lexicon)) as pool:
+        for results, book_errors in pool.imap(analyze_book, range(1, 28)):
+            errors.extend(book_errors)
+            for lemma, mounce_cat, key, case_number, theme, entry in results:
+                mounce_by_lemma[lemma].update(mounce_cat)
+                theme_by_lemma[lemma][key].add(theme)
+                forms_by_lemma[lemma][key][case_number].add(entry)
+
+    if errors:
+        for message in errors:
+            print("\x1b[31m" + message + "\x1b[0m", file=sys.stderr)
+        print("{} errors".format(len(errors)), file=sys.stderr)
+        sys.exit(1)
+
+    output_space_delimited(forms_by_lemma, theme_by_lemma, mounce_by_lemma)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@
 
 from collections import defaultdict
 import os.path
-import re
 import sys
 import unicodedata
 
@@ -39,17 +38,93 @@ with open(os.path.join(os.path.dirname(__file__), "ending-paradigms.txt")) as f:
         ENDINGS[tense_voice].append(endings)
 
 
-fs = filesets.load("filesets.yaml")
+PERSON_NUMBERS = ["1S", "2S", "3S", "1P", "2P", "3P"]
 
-# lemma -> tense_voice -> person_number -> set of forms
-forms = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
 
+# Paradigms are represented as bits (bit i is ENDINGS[tense_voice][i]) so the
+# paradigms compatible with a lemma are a few integer ANDs over its observed
+# person-numbers.
+
+# tense_voice -> person_number -> ending -> bitset of paradigms
+PARADIGMS_BY_CELL_ENDING = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+
+for tense_voice, paradigms in ENDINGS.items():
+    for i, endings in enumerate(paradigms):
+        for person_number in PERSON_NUMBERS:
+            PARADIGMS_BY_CELL_ENDING[tense_voice][person_number][endings.get(person_number, "?")] |= 1 << i
 
-def equal(lst):
+
+def members(bits):
+    i = 0
+    while bits:
+        if bits & 1:
+            yield i
+        bits >>= 1
+        i += 1
+
+
+def cell_stem(form_list, ending):
+    """
+    return the single stem the sorted forms of a cell have with the sorted
+    alternatives of ending, or None if they don't fit.
     """
-    are all elements of lst equal?
+    ending_list = sorted(ending.split("/"))
+    if len(form_list) != len(ending_list):
+        return None
+    stems = set()
+    for end, form in zip(ending_list, form_list):
+        if not form.endswith(end):
+            return None
+        stems.add(form[:len(form) - len(end)])
+    if len(stems) == 1:
+        return stems.pop()
+    return None
+
+
+def stem_rules(tense_voice, cells):
     """
-    return lst.count(lst[0]) == len(lst)
+    return [(line num, stem, number of person-numbers checked), ...] for
+    the paradigms of tense_voice compatible with cells (person_number -> set
+    of forms), where "?" endings match anything.
+    """
+    paradigms = ENDINGS[tense_voice]
+    everything = (1 << len(paradigms)) - 1
+    only_wildcards = everything  # paradigms with "?" in every cell so far
+    by_stem = {}  # stem -> paradigms consistent with that stem so far
+    any_stem = defaultdict(int)  # stem -> paradigms proposing it at least once
+    checked = []  # per observed cell: paradigms with a real ending there
+    for person_number in PERSON_NUMBERS:
+        if not cells.get(person_number):
+            continue
+        form_list = sorted(cells[person_number])
+        wildcard = 0
+        stems = defaultdict(int)
+        for ending, bits in PARADIGMS_BY_CELL_ENDING[tense_voice][person_number].items():
+            if ending == "?":
+                wildcard |= bits
+                continue
+            stem = cell_stem(form_list, ending)
+            if stem is not None:
+                stems[stem] |= bits
+        checked.append(everything & ~wildcard)
+        for stem in set(by_stem) | set(stems):
+            by_stem[stem] = by_stem.get(stem, only_wildcards) & (wildcard | stems.get(stem, 0))
+        for stem, bits in stems.items():
+            any_stem[stem] |= bits
+        only_wildcards &= wildcard
+
+    results = []
+    for stem, bits in by_stem.items():
+        for i in members(bits & any_stem[stem]):
+            count = sum(1 for c in checked if c >> i & 1)
+            results.append((i, paradigms[i]["num"], stem, count))
+    return [(num, stem, count) for i, num, stem, count in sorted(results)]
+
+
+fs = filesets.load("filesets.yaml")
+
+# lemma -> tense_voice -> person_number -> set of forms
+forms = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
 
 
 for row in fs["sblgnt-lexemes"].rows():
@@ -81,47 +156,11 @@ for lemma, form_dict in sorted_items(forms):
     for tense_voice in sorted(form_dict):
         print()
         print(lemma, tense_voice, len(form_dict[tense_voice]))
-        stem_rules = []
-        # print(form_dict[tense_voice])
-        for endings in ENDINGS[tense_voice]:
-            fail = False
-            stems = []
-            num = endings["num"]
-            # print("\t", num, endings)
-            for person_number, ending in sorted(endings.items()):
-                if person_number == "num":
-                    continue
-                # print("\t\t\t", person_number, ending)
-                ending = sorted(ending.split("/"))
-                x = sorted(form_dict[tense_voice].get(person_number, "?"))
-                if ending == ["?"] or x == ["?"]:
-                    # print("\t\t\t\tskip because of ?")
-                    continue
-                if len(ending) != len(x):
-                    fail = True
-                    # print("\t\t\t\tfail because len", ending, "!= len", x)
-                    break
-                stem_possibilities = set()
-                for a, b in zip(ending, x):
-                    # print("\t\t\t\t\ttesting", a, b)
-                    regex = a.replace("?", "\\?").replace("(", "\\(").replace(")", "\\)") + "$"
-                    if not re.search(regex, b):
-                        fail = True
-                        break
-                    # print("\t\t\t", person_number, a, b, re.sub(regex, "", b))
-                    stem_possibilities.add(re.sub(regex, "", b))
-                if len(stem_possibilities) == 1:
-                    stems.append(list(stem_possibilities)[0])
-                else:
-                    fail = True
-                    break
-            # print("\t\t", stems, fail)
-            if stems and not fail and equal(stems):
-                stem_rules.append((num, stems[0], len(stems)))
-
-        if len(stem_rules) == 0:
+        rules = stem_rules(tense_voice, form_dict[tense_voice])
+
+        if len(rules) == 0:
             print(form_dict[tense_voice])
             print("no rules matched")
             sys.exit(1)
-        for rule, stem, count in stem_rules:
+        for rule, stem, count in rules:
             print("  rule-{} {} {}".format(rule, stem, count))
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 
 from collections import defaultdict
+from multiprocessing import Pool
 import os.path
-import re
 import sys
 import unicodedata
 
@@ -11,9 +11,6 @@ from morphgnt import filesets
 from morphgnt.utils import sorted_items
 
 
-fs = filesets.load("filesets.yaml")
-
-
 ACUTE = u"\u0301"
 GRAVE = u"\u0300"
 CIRCUMFLEX = u"\u0342"
@@ -42,10 +39,46 @@ with open(os.path.join(os.path.dirname(__file__), "ending-paradigms.txt")) as f:
         ENDINGS[tense_voice].append(endings)
 
 
-fs = filesets.load("filesets.yaml")
+class SuffixIndex(object):
+    """
+    the endings of all paradigms of one tense_voice in a trie keyed by the
+    reversed ending, so a single walk back from the end of a form finds
+    every (paradigm, person_number, ending) it is compatible with.
+    """
 
-# lemma -> tense_voice -> person_number -> set of forms
-forms = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
+    def __init__(self, paradigms):
+        self.root = {}
+        for i, endings in enumerate(paradigms):
+            for person_number, ending in endings.items():
+                if person_number == "num" or ending == "?":
+                    continue
+                for alternative in ending.split("/"):
+                    node = self.root
+                    for ch in reversed(alternative):
+                        node = node.setdefault(ch, {})
+                    node.setdefault(None, []).append((i, person_number, alternative))
+
+    def lookup(self, form):
+        """
+        return (paradigm, person_number) -> {ending: stem} for form.
+        """
+        matches = defaultdict(dict)
+        node = self.root
+        depth = 0
+        while True:
+            for i, person_number, alternative in node.get(None, ()):
+                matches[i, person_number][alternative] = form[:len(form) - depth]
+            if depth == len(form) or form[-1 - depth] not in node:
+                break
+            node = node[form[-1 - depth]]
+            depth += 1
+        return matches
+
+
+INDEXES = {
+    tense_voice: SuffixIndex(paradigms)
+    for tense_voice, paradigms in ENDINGS.items()
+}
 
 
 def equal(lst):
@@ -55,21 +88,59 @@ def equal(lst):
     return lst.count(lst[0]) == len(lst)
 
 
-for row in fs["sblgnt-lexemes"].rows():
-    if row["ccat-pos"] == "V-":
-        mood = row["ccat-parse"][3]
-        if mood in "I":
-            person_number = row["ccat-parse"][0] + row["ccat-parse"][5]
-            tense_voice = row["ccat-parse"][1:3]
-            forms[row["lemma"]][tense_voice][person_number].add(strip_accents(row["norm"]))
-        elif mood in "DSO":
-            pass
-        elif mood in "P":
-            pass
-        elif mood in "N":
-            pass
-        else:
-            raise ValueError
+def first_singular_forms(tense_voice, forms_by_person_number):
+    """
+    return the 1S forms implied by every paradigm of tense_voice that the
+    given forms are compatible with (with a single stem).
+    """
+    paradigms = ENDINGS[tense_voice]
+    index = INDEXES.get(tense_voice)
+    if index is None:
+        return []
+    matches = {
+        form: index.lookup(form)
+        for forms in forms_by_person_number.values()
+        for form in forms
+    }
+    candidates = sorted({i for m in matches.values() for i, person_number in m})
+
+    results = []
+    for i in candidates:
+        endings = paradigms[i]
+        fail = False
+        stems = []
+        for person_number, ending in sorted(endings.items()):
+            if person_number == "num":
+                continue
+            ending = sorted(ending.split("/"))
+            x = sorted(forms_by_person_number.get(person_number, "?"))
+            if ending == ["?"] or x == ["?"]:
+                continue
+            if len(ending) != len(x):
+                fail = True
+                break
+            stem_possibilities = set()
+            for a, b in zip(ending, x):
+                stem = matches[b].get((i, person_number), {}).get(a)
+                if stem is None:
+                    fail = True
+                    break
+                stem_possibilities.add(stem)
+            if fail or len(stem_possibilities) != 1:
+                fail = True
+                break
+            stems.append(stem_possibilities.pop())
+        if stems and not fail and equal(stems):
+            results.append(stems[0] + endings["1S"])
+    return results
+
+
+def analyze_lemma(item):
+    lemma, form_dict = item
+    return lemma, [
+        (tense_voice, first_singular_forms(tense_voice, form_dict[tense_voice]))
+        for tense_voice in sorted(form_dict)
+    ]
 
 
 SKIP_LIST = [
@@ -77,47 +148,54 @@ SKIP_LIST = [
     "χρή",
 ]
 
-for lemma, form_dict in sorted_items(forms):
-    if lemma in SKIP_LIST:
-        continue
-
-    print()
-    for tense_voice in sorted(form_dict):
-        first_singular_forms = set()
-        for endings in ENDINGS[tense_voice]:
-            fail = False
-            stems = []
-            num = endings["num"]
-            first_singular = endings["1S"]
-            for person_number, ending in sorted(endings.items()):
-                if person_number == "num":
-                    continue
-                ending = sorted(ending.split("/"))
-                x = sorted(form_dict[tense_voice].get(person_number, "?"))
-                if ending == ["?"] or x == ["?"]:
-                    continue
-                if len(ending) != len(x):
-                    fail = True
-                    break
-                stem_possibilities = set()
-                for a, b in zip(ending, x):
-                    regex = a.replace("?", "\\?").replace("(", "\\(").replace(")", "\\)") + "$"
-                    if not re.search(regex, b):
-                        fail = True
-                        break
-                    stem_possibilities.add(re.sub(regex, "", b))
-                if len(stem_possibilities) == 1:
-                    stems.append(list(stem_possibilities)[0])
-                else:
-                    fail = True
-                    break
-            if stems and not fail and equal(stems):
-                first_singular_forms.add(stems[0] + first_singular)
 
-        if len(first_singular_forms) == 0:
+def main():
+    fs = filesets.load("filesets.yaml")
+
+    # lemma -> tense_voice -> person_number -> set of forms
+    forms = defaultdict(lambda: defaultdict(lambda: defaultdict(set)))
+
+    for row in fs["sblgnt-lexemes"].rows():
+        if row["ccat-pos"] == "V-":
+            mood = row["ccat-parse"][3]
+            if mood in "I":
+                person_number = row["ccat-parse"][0] + row["ccat-parse"][5]
+                tense_voice = row["ccat-parse"][1:3]
+                forms[row["lemma"]][tense_voice][person_number].add(strip_accents(row["norm"]))
+            elif mood in "DSO":
+                pass
+            elif mood in "P":
+                pass
+            elif mood in "N":
+                pass
+            else:
+                raise ValueError
+
+    items = [
+        (lemma, {tense_voice: dict(d) for tense_voice, d in form_dict.items()})
+        for lemma, form_dict in sorted_items(forms)
+        if lemma not in SKIP_LIST
+    ]
+
+    failures = []
+    with Pool() as pool:
+        for lemma, results in pool.imap(analyze_lemma, items, chunksize=64):
             print()
-            print(lemma, tense_voice)
-            print(form_dict[tense_voice])
-            print("no rules matched")
-            sys.exit(1)
-        print("{} {} {}".format(lemma, tense_voice, "|".join(form for form in first_singular_forms)))
+            for tense_voice, first_singular in results:
+                if not first_singular:
+                    failures.append((lemma, tense_voice))
+                    continue
+                print("{} {} {}".format(lemma, tense_voice, "|".join(form for form in set(first_singular))))
+
+    for lemma, tense_voice in failures:
+        print()
+        print(lemma, tense_voice)
+        print(forms[lemma][tense_voice])
+        print("no rules matched")
+    if failures:
+        print("{} lemma/tense-voice combinations unmatched".format(len(failures)), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
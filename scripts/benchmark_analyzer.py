@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+"""
+score morphgnt.analyze against the tagging of a fileset and report its
+throughput.
+
+For each POS, "lemma" and "parse" count tokens whose best candidate has the
+tagged lemma or parse, "both" those whose best candidate is exactly right,
+"any" those where some candidate is, and "none" tokens with no analysis.
+
+The analyzer is scored on its rules alone by default; principal_parts.txt
+was itself extracted from SBLGNT, so --principal-parts (which adds its
+tense stems) scores it partly against its own source.
+"""
+
+import argparse
+from collections import Counter, defaultdict
+import time
+
+from morphgnt import analyze, filesets
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("--fileset", default="sblgnt-lexemes")
+argparser.add_argument("--limit", type=int, help="only analyze this many tokens")
+argparser.add_argument("--ref", help="only analyze this passage (e.g. Jn 3:1-21)")
+argparser.add_argument(
+    "--principal-parts", action="store_true",
+    help="add the stems of principal_parts.txt (which was itself extracted from SBLGNT)")
+args = argparser.parse_args()
+
+start = time.time()
+if args.principal_parts:
+    analyzer = analyze.load()
+else:
+    analyzer = analyze.load(principal_parts=None)
+print("analyzer loaded in {:.2f}s".format(time.time() - start))
+
+rows = []
+for row in filesets.load("filesets.yaml")[args.fileset].rows(ref=args.ref):
+    rows.append((row["word"], row["ccat-pos"], row["ccat-parse"], row["lemma"]))
+    if len(rows) == args.limit:
+        break
+
+distinct = {word for word, pos, parse, lemma in rows}
+
+start = time.time()
+for word in distinct:
+    analyzer.analyze(word)
+cold = time.time() - start
+
+start = time.time()
+results = [analyzer.analyze(word) for word, pos, parse, lemma in rows]
+warm = time.time() - start
+
+print("{} distinct forms in {:.2f}s ({:.0f} forms/s)".format(len(distinct), cold, len(distinct) / cold))
+print("{} tokens in {:.2f}s ({:.0f} tokens/s) once analyzed".format(len(rows), warm, len(rows) / warm))
+print("{} tokens/s overall".format(int(len(rows) / (cold + warm))))
+print()
+
+COLUMNS = ["lemma", "parse", "both", "any", "none"]
+
+counts = defaultdict(Counter)
+for (word, pos, parse, lemma), candidates in zip(rows, results):
+    for key in [pos, "all"]:
+        counts[key]["tokens"] += 1
+        if not candidates:
+            counts[key]["none"] += 1
+            continue
+        best_lemma, best_parse = candidates[0]
+        counts[key]["lemma"] += best_lemma == lemma
+        counts[key]["parse"] += best_parse == parse
+        counts[key]["both"] += (best_lemma, best_parse) == (lemma, parse)
+        counts[key]["any"] += (lemma, parse) in candidates
+
+print("{:5} {:>7} ".format("pos", "tokens") + " ".join("{:>7}".format(column) for column in COLUMNS))
+for pos in sorted(counts, key=lambda pos: (pos == "all", -counts[pos]["tokens"])):
+    tokens = counts[pos]["tokens"]
+    print("{:5} {:>7} ".format(pos, tokens) + " ".join(
+        "{:>7.1%}".format(counts[pos][column] / tokens) for column in COLUMNS
+    ))
@@ -1,7 +1,5 @@
 #!/usr/bin/env python3
 
-DEBUG = False
-
 from collections import defaultdict
 import unicodedata
 
@@ -52,14 +50,13 @@ for row in fs["sblgnt-lexemes"].rows():
         forms[key][case_number].add(strip_accents(row["norm"]))
 
 
+CASE_NUMBERS = ["NS", "GS", "AS", "DS", "VS", "NP", "GP", "AP", "DP", "VP"]
+
 # list of dicts mapping person_number to ending (or ?)
 ENDINGS = []
 
 NUMBERS = set()
 
-# line num -> set of line num
-MUTUAL = defaultdict(set)
-
 FAILS = []
 
 with open("nominal-endings.txt") as f:
@@ -69,73 +66,135 @@ with open("nominal-endings.txt") as f:
         line = line.split("#")[0].strip()
         if not line:
             continue
-        endings = dict(zip(["NS", "GS", "AS", "DS", "VS", "NP", "GP", "AP", "DP", "VP", "line_num"], [i.strip() for i in line.split()] + [num]))
+        endings = dict(zip(CASE_NUMBERS + ["line_num"], [i.strip() for i in line.split()] + [num]))
         NUMBERS.add(num)
         ENDINGS.append(endings)
 
-for i in NUMBERS:
-    for j in NUMBERS:
-        if i != j:
-            MUTUAL[i].add(j)
+
+# Paradigm lines are represented as bits (bit i is ENDINGS[i]) so the set of
+# lines compatible with a lemma is a few integer ANDs over its observed cells.
+
+# case_number -> ending -> bitset of lines with that ending in that cell
+LINES_BY_CELL_ENDING = defaultdict(lambda: defaultdict(int))
+
+for i, endings in enumerate(ENDINGS):
+    for case_number in CASE_NUMBERS:
+        LINES_BY_CELL_ENDING[case_number][endings[case_number]] |= 1 << i
+
+
+def members(bits):
+    i = 0
+    while bits:
+        if bits & 1:
+            yield i
+        bits >>= 1
+        i += 1
+
+
+def cell_stems(form_list, ending):
+    """
+    return the tuple of stems proposed by zipping the sorted forms of a cell
+    with the sorted alternatives of ending, or None if they don't fit.
+    """
+    ending_list = sorted(ending.split("/"))
+    if len(form_list) != len(ending_list):
+        return None
+    stems = []
+    for form, end in zip(form_list, ending_list):
+        proposed_stem = stemmer(form, end)
+        if proposed_stem is None:
+            return None
+        stems.append(proposed_stem)
+    return tuple(stems)
+
+
+def matching_lines(cells):
+    """
+    return [(line_num, stem), ...] for the lines of nominal-endings.txt
+    compatible with cells (case_number -> set of forms).
+
+    The lemma's stem is the first non-empty stem proposed and every later
+    proposed stem must equal it, so a line matches with stem s if its
+    observed cells propose only "" up to some cell, s (possibly after some
+    "") in that cell and only s after it.
+    """
+    observed = [case_number for case_number in CASE_NUMBERS if cells.get(case_number)]
+
+    empty = []  # per observed cell: lines proposing only ""
+    uniform = []  # per observed cell: stem -> lines proposing only that stem
+    mixed = []  # per observed cell: stem -> lines proposing "" then that stem
+    stems = set()
+    for case_number in observed:
+        form_list = sorted(cells[case_number])
+        e = 0
+        u = defaultdict(int)
+        m = defaultdict(int)
+        for ending, bits in LINES_BY_CELL_ENDING[case_number].items():
+            proposed = cell_stems(form_list, ending)
+            if proposed is None:
+                continue
+            nonempty = [p for p in proposed if p]
+            if not nonempty:
+                e |= bits
+            elif nonempty[0] != proposed[0]:
+                if proposed[proposed.index(nonempty[0]):] == tuple(nonempty) and len(set(nonempty)) == 1:
+                    m[nonempty[0]] |= bits
+            elif len(set(proposed)) == 1:
+                u[proposed[0]] |= bits
+        empty.append(e)
+        uniform.append(u)
+        mixed.append(m)
+        stems.update(u)
+        stems.update(m)
+
+    if not observed:
+        return []
+
+    everything = (1 << len(ENDINGS)) - 1
+    results = {}
+
+    all_empty = everything
+    for e in empty:
+        all_empty &= e
+    for i in members(all_empty):
+        results[i] = ""
+
+    for stem in stems:
+        # suffix[k] = lines proposing only stem in every cell after k
+        suffix = [everything] * (len(observed) + 1)
+        for k in range(len(observed) - 1, -1, -1):
+            suffix[k] = suffix[k + 1] & uniform[k].get(stem, 0)
+        prefix = everything
+        bits = 0
+        for k in range(len(observed)):
+            bits |= prefix & (uniform[k].get(stem, 0) | mixed[k].get(stem, 0)) & suffix[k + 1]
+            prefix &= empty[k]
+        for i in members(bits):
+            results[i] = stem
+
+    return [(ENDINGS[i]["line_num"], results[i]) for i in sorted(results)]
+
+
+# line num -> bitset of lines matched whenever it was
+MUTUAL = {}
+for i, endings in enumerate(ENDINGS):
+    MUTUAL[endings["line_num"]] = ((1 << len(ENDINGS)) - 1) & ~(1 << i)
+
+INDEX_BY_LINE_NUM = {endings["line_num"]: i for i, endings in enumerate(ENDINGS)}
 
 
 for lemma in sorted(forms, key=collator.sort_key):
-    if DEBUG: print()
-    if DEBUG: print(lemma, forms[lemma])
-
-    matches = []
-    for ending in ENDINGS:
-        if DEBUG: print("    checking against", ending)
-        fail = False
-        stem = None
-        for case_number in ["NS", "GS", "AS", "DS", "VS", "NP", "GP", "AP", "DP", "VP"]:
-            if DEBUG: print("        {} {} {}".format(case_number, forms[lemma][case_number], ending[case_number]))
-            if not forms[lemma][case_number]:
-                if DEBUG: print("        skip")
-                continue
-            form_list = sorted(forms[lemma][case_number])
-            ending_list = sorted(ending[case_number].split("/"))
-            if len(form_list) != len(ending_list):
-                if DEBUG: print("        different lengths")
-                fail = True
-                break
-            for form, end in zip(form_list, ending_list):
-                if DEBUG: print("            {} {}".format(form, end))
-                proposed_stem = stemmer(form, end)
-                if proposed_stem is None:
-                    if DEBUG: print("        no match")
-                    fail = True
-                    break
-                else:
-                    if DEBUG: print("        proposed stem {}".format(proposed_stem))
-                    if not stem:
-                        stem = proposed_stem
-                    if stem == proposed_stem:
-                        if DEBUG: print("        {} == {}".format(stem, proposed_stem))
-                    else:
-                        if DEBUG: print("        stem failed")
-                        fail = True
-                        break
-            if fail:
-                break
-        if fail or stem is None:
-            if DEBUG: print("    failed")
-        else:
-            if DEBUG: print("    line {} matched with stem {}".format(ending["line_num"], stem))
-            matches.append((ending["line_num"], stem))
-            if ending["line_num"] in NUMBERS:
-                NUMBERS.remove(ending["line_num"])
-    # print("RESULT {} {}".format(matches, lemma))
+    matches = matching_lines(forms[lemma])
+    for line_num, stem in matches:
+        if line_num in NUMBERS:
+            NUMBERS.remove(line_num)
     if not matches:
         FAILS.append(lemma)
-    matched_lines = [num for num, stem in matches]
-    for i in MUTUAL:
-        to_remove = set()
-        for j in MUTUAL[i]:
-            if i in matched_lines and not j in matched_lines:
-                to_remove.add(j)
-        for j in to_remove:
-            MUTUAL[i].remove(j)
+    matched_bits = 0
+    for line_num, stem in matches:
+        matched_bits |= 1 << INDEX_BY_LINE_NUM[line_num]
+    for line_num, stem in matches:
+        MUTUAL[line_num] &= matched_bits
 
 print()
 print("unused line numbers {}".format(sorted(NUMBERS)))
@@ -153,4 +212,6 @@ if FAILS:
 print()
 for i in MUTUAL:
     if MUTUAL[i]:
-        print("{} < {}".format(i, MUTUAL[i]))
+        print("{} < {{{}}}".format(i, ", ".join(
+            str(ENDINGS[j]["line_num"]) for j in members(MUTUAL[i])
+        )))
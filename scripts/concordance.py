@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""
+print the occurrences of lemmas in a fileset in context (keyword in
+context), e.g.
+
+    040316 Οὕτως γὰρ ἠγάπησεν ὁ θεὸς [τὸν] κόσμον ὥστε τὸν ⸀υἱὸν τὸν
+"""
+
+import argparse
+import sys
+import time
+
+from morphgnt import concordance, filesets
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("lemma", nargs="+")
+argparser.add_argument("--fileset", default="sblgnt-lexemes")
+argparser.add_argument("--width", type=int, default=5, help="tokens of context either side")
+argparser.add_argument("--limit", type=int, help="only print this many occurrences of each lemma")
+args = argparser.parse_args()
+
+start = time.time()
+index = concordance.load(filesets.load("filesets.yaml")[args.fileset])
+loaded = time.time()
+
+for lemma in args.lemma:
+    lines = index.kwic(lemma, args.width)
+    print("{} ({} occurrences):".format(lemma, len(lines)))
+    for bcv, left, token, right in lines[:args.limit]:
+        print("    {} {:>40} [{}] {}".format(bcv, " ".join(left), token, " ".join(right)))
+
+print("loaded in {:.0f}ms, looked up in {:.0f}ms".format((loaded - start) * 1000, (time.time() - loaded) * 1000), file=sys.stderr)
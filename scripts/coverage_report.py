@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+vocabulary reports for readers of a fileset:
+
+    coverage  tokens and lemmas of each book (or, with --chapters, chapter)
+              and how many of its most frequent lemmas cover each of
+              --levels percent of its tokens
+    curve     the cumulative number of distinct lemmas at the end of each
+              chapter (or, without --chapters, book) in canonical order
+    new       the lemmas first found in each chapter (or book), most
+              frequent first, with their glosses from lexemes.yaml
+
+e.g. coverage_report.py coverage --levels 90 95
+     coverage_report.py new --chapters --book Jn
+"""
+
+import argparse
+import sys
+import time
+
+from morphgnt import filesets
+from morphgnt.cache import cached
+from morphgnt.coverage import Coverage
+from morphgnt.utils import load_yaml
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("report", choices=["coverage", "curve", "new"])
+argparser.add_argument("--fileset", default="sblgnt-lexemes")
+argparser.add_argument("--chapters", action="store_true", help="report by chapter rather than book")
+argparser.add_argument("--book", help="only report this book (e.g. Jn)")
+argparser.add_argument("--levels", type=float, nargs="+", default=[50, 80, 90, 95, 98])
+argparser.add_argument("--lexemes", default="lexemes.yaml")
+args = argparser.parse_args()
+
+start = time.time()
+coverage = Coverage(filesets.load("filesets.yaml")[args.fileset].table())
+built = time.time()
+
+units = coverage.chapters if args.chapters else coverage.books
+
+
+def wanted(name):
+    return not args.book or name.split()[0] == args.book
+
+
+if args.report == "coverage":
+    print("{:10} {:>7} {:>6} ".format("", "tokens", "lemmas") + " ".join(
+        "{:>6}".format("{:g}%".format(level)) for level in args.levels
+    ))
+    for unit in [unit for unit in units if wanted(unit.name)] + ([coverage.total] if not args.book else []):
+        print("{:10} {:>7} {:>6} ".format(unit.name, unit.tokens, unit.lemmas) + " ".join(
+            "{:>6}".format(unit.lemmas_for(level)) for level in args.levels
+        ))
+
+elif args.report == "curve":
+    for name, tokens, lemmas in coverage.curve(units):
+        if wanted(name):
+            print("{:10} {:>7} {:>6}".format(name, tokens, lemmas))
+
+else:
+    lexemes = cached("lexemes", [args.lexemes], lambda: load_yaml(args.lexemes))
+    for name, lemmas in coverage.new_lemmas(units):
+        if wanted(name):
+            print("{} ({} new):".format(name, len(lemmas)))
+            for lemma in lemmas:
+                print("    {} {}".format(lemma, lexemes.get(lemma, {}).get("gloss", "")))
+
+print("computed in {:.0f}ms, reported in {:.0f}ms".format(
+    (built - start) * 1000, (time.time() - built) * 1000
+), file=sys.stderr)
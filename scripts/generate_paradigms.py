@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+generate full nominal paradigms for every lexeme in lexemes.yaml.
+
+Cells attested in forms.yaml are given with their attested forms; the
+others with generated forms marked with a *, e.g.
+
+    λόγος:
+        M:
+            NS: λόγος
+            GS: λόγου
+            DS: λόγῳ
+            VS: *λόγε
+
+Cells the generator has no ending for are given as ?. Comparatives and
+superlatives forms.yaml lists with their positive (νεώτεροι under νέος)
+don't count as attested.
+
+The number of attested cells the generator reproduces is reported at the
+end, which is the quickest check of a category fix, and --check prints
+each attested cell it doesn't reproduce instead of the paradigms, e.g.
+
+    ἔρις F AS: ἔριν (generated ἔριδα)
+    σφραγίς F AS: σφραγῖδα (generated σφραγίδα, accent only)
+"""
+
+import argparse
+from multiprocessing import Pool
+import sys
+import time
+
+from morphgnt import accent, paradigms
+from morphgnt.cache import cached
+from morphgnt.utils import load_yaml, sorted_items, strip_accents
+
+
+generator = None
+
+
+def init(g):
+    global generator
+    generator = g
+
+
+def generate(chunk):
+    """
+    return the paradigms of a chunk of (lemma, metadata) and the accent
+    cache hits and misses generating them took.
+    """
+    before = accent.stats()["accented"]
+    results = [(lemma, generator.paradigm(lemma, metadata)) for lemma, metadata in chunk]
+    after = accent.stats()["accented"]
+    return results, after[0] - before[0], after[1] - before[1]
+
+
+def main():
+    argparser = argparse.ArgumentParser()
+    argparser.add_argument("--lexemes", default="lexemes.yaml")
+    argparser.add_argument("--forms", default="forms.yaml")
+    argparser.add_argument("--lemma", nargs="*", help="only generate these lemmas")
+    argparser.add_argument("--processes", type=int, help="defaults to the number of CPUs")
+    argparser.add_argument("--check", action="store_true", help="only print the attested cells not reproduced")
+    args = argparser.parse_args()
+
+    start = time.time()
+    lexemes = cached("lexemes", [args.lexemes], lambda: load_yaml(args.lexemes))
+    forms = cached("forms", [args.forms], lambda: load_yaml(args.forms))
+    items = [
+        (lemma, metadata) for lemma, metadata in sorted_items(lexemes)
+        if str(metadata.get("pos", "")).split("/")[0] in ["N", "A"]
+    ]
+    if args.lemma:
+        items = [(lemma, metadata) for lemma, metadata in items if lemma in args.lemma]
+
+    g = paradigms.load()
+    chunks = [items[i:i + 64] for i in range(0, len(items), 64)]
+    results = []
+    hits = misses = 0
+    with Pool(args.processes, initializer=init, initargs=(g,)) as pool:
+        for chunk_results, chunk_hits, chunk_misses in pool.imap(generate, chunks):
+            results.extend(chunk_results)
+            hits += chunk_hits
+            misses += chunk_misses
+
+    excluded = paradigms.graded_forms()
+    cells = unfilled = attested = reproduced = accent_only = not_generated = 0
+    missing = []
+    for lemma, paradigm in results:
+        if not paradigm:
+            missing.append(lemma)
+            continue
+        if not args.check:
+            print("{}:".format(lemma))
+        for gender in paradigms.GENDERS:
+            if gender not in paradigm and gender not in forms.get(lemma, {}):
+                continue
+            if not args.check:
+                print("    {}:".format(gender))
+            for case_number in paradigms.CASE_NUMBERS:
+                generated = paradigm.get(gender, {}).get(case_number, [])
+                cells += 1
+                unfilled += not generated
+                found = paradigms.attested_forms(forms, lemma, gender, case_number, excluded)
+                if found:
+                    attested += 1
+                    if set(found) & set(generated):
+                        reproduced += 1
+                    elif not generated:
+                        not_generated += 1
+                        if args.check:
+                            print("{} {} {}: {} (not generated)".format(lemma, gender, case_number, "/".join(found)))
+                    else:
+                        same = {strip_accents(form) for form in found} & {strip_accents(form) for form in generated}
+                        accent_only += bool(same)
+                        if args.check:
+                            print("{} {} {}: {} (generated {}{})".format(
+                                lemma, gender, case_number, "/".join(found), "/".join(generated),
+                                ", accent only" if same else "",
+                            ))
+                    if not args.check:
+                        print("        {}: {}".format(case_number, "/".join(found)))
+                elif not args.check:
+                    print("        {}: {}".format(case_number, "*" + "/".join(generated) if generated else "?"))
+
+    print("{} lexemes, {} cells ({} without an ending, {} attested, {} of them reproduced), {} lexemes without a paradigm, in {:.1f}s".format(
+        len(results) - len(missing), cells, unfilled, attested, reproduced, len(missing), time.time() - start
+    ), file=sys.stderr)
+    print("attested cells not reproduced: {} accent only, {} wrong, {} not generated".format(
+        accent_only, attested - reproduced - accent_only - not_generated, not_generated
+    ), file=sys.stderr)
+    print("accent cache: {} hits, {} misses ({:.1%} hit rate)".format(
+        hits, misses, hits / (hits + misses) if hits + misses else 0
+    ), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
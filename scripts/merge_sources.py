@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""
+fill in missing lexeme fields from the external lexica declared in
+sources.yaml and print the merged lexemes.yaml to stdout.
+
+Unmatched lexemes, source entries no lexeme matched and other problems are
+reported on stderr.
+"""
+
+import argparse
+import sys
+
+from morphgnt import merge
+from morphgnt.utils import load_yaml, print_lexemes
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("sources", nargs="*", help="names of sources to merge (default all)")
+argparser.add_argument("--config", default="sources.yaml")
+argparser.add_argument("--lexemes", default="lexemes.yaml")
+argparser.add_argument("--unmatched-keys", action="store_true", help="list source keys no lexeme matched")
+args = argparser.parse_args()
+
+config = merge.load(args.config)
+sources = [config[name] for name in (args.sources or sorted(config))]
+
+merged, reports = merge.merge(load_yaml(args.lexemes), sources)
+
+print_lexemes(merged)
+
+for report in reports:
+    print(report.source.name, file=sys.stderr)
+    print("    filled {} ({} skipped)".format(report.filled, report.skipped), file=sys.stderr)
+    print("    {} problems".format(len(report.problems)), file=sys.stderr)
+    for problem in report.problems:
+        print("\t", problem, file=sys.stderr)
+    print("    {} lexemes not found".format(len(report.unmatched_lexemes)), file=sys.stderr)
+    for lexeme in report.unmatched_lexemes:
+        print("\t", lexeme, file=sys.stderr)
+    print("    {} source keys unmatched".format(len(report.unmatched_keys)), file=sys.stderr)
+    if args.unmatched_keys:
+        for key in report.unmatched_keys:
+            print("\t", key, file=sys.stderr)
@@ -1,44 +1,44 @@
 #!/usr/bin/env python3
 
-from collections import defaultdict
 from unicodedata import normalize
 
-# (ending, parse)->int(count)
-counts = defaultdict(int)
+from morphgnt import endings
 
-# (ending)->set(parse)
-parses = defaultdict(set)
 
-# (ending)->set(rule)
-rules = defaultdict(set)
+tree = endings.load("ending_tree.txt")
 
-
-with open("ending_tree.txt") as stream:
-    for line in stream:
-        path, rule, parse, count = line.strip().split()
-        for step in path.split("/"):
-            counts[(step, parse)] += int(count)
-            parses[step].add(parse)
-            rules[step].add(int(rule.strip("{}")))
+# character -> its NFD decomposition, so each character is only normalized
+# once however many sort keys it appears in
+NFD = {}
 
 
 def collation_key(step):
+    chars = []
+    for ch in step:
+        if ch not in NFD:
+            NFD[ch] = normalize("NFD", ch)
+        chars.append(NFD[ch])
     path = []
     if step.endswith("(ν)"):
         start = 3
     else:
         start = 1
     for j in range(start, min(6, len(step) + 1)):
-        path.append(normalize("NFD", step[-j:]))
+        path.append("".join(chars[-j:]))
     return tuple(path)
 
-for ending in sorted(parses, key=collation_key):
-    if parses[ending] != parses[ending[1:]] or len(parses[ending]) > 1:
+
+counts = {ending: parse_counts for ending, parse_counts, rules in tree.endings()}
+
+for ending in sorted(counts, key=collation_key):
+    parent_counts, parent_rules = tree.lookup(ending[1:])
+    if counts[ending].keys() != parent_counts.keys() or len(counts[ending]) > 1:
+        parse_counts, rules = tree.lookup(ending)
         print(
             "    " * (len(collation_key(ending)) - 1) + "-" + ending + ":",
             ";".join([
-                "{}/{}".format(parse, counts[ending, parse])
-                for parse in parses[ending]
+                "{}/{}".format(parse, parse_counts[parse])
+                for parse in sorted(parse_counts)
             ]),
-            rules[ending],
+            "{" + ", ".join(str(rule) for rule in sorted(rules)) + "}",
         )
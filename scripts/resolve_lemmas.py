@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+
+"""
+resolve words (one per line, or a missing_*.txt word set) against the
+headwords of lexemes.yaml, ignoring case, accents and breathing as needed.
+
+Prints each word with the level it matched at and its candidate headwords.
+"""
+
+import argparse
+
+from morphgnt.lookup import LEVELS, lexeme_index
+from morphgnt.utils import load_wordset
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("wordset", help="word set file")
+argparser.add_argument("--lexemes", default="lexemes.yaml")
+argparser.add_argument("--max-level", choices=LEVELS, default="breathing")
+args = argparser.parse_args()
+
+index = lexeme_index(args.lexemes)
+
+for word in sorted(load_wordset(args.wordset)):
+    level, headwords = index.resolve(word, args.max_level)
+    print("{} {} {}".format(word, level or "-", " ".join(headwords)))
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""
+find the forms of a fileset containing, beginning or ending with strings,
+e.g. for ending research
+
+    ./scripts/search_forms.py --end --variant unaccented σθαι ουσθαι
+
+prints, for each string, the number of tokens and distinct forms matching
+and then each form with its count (or, with --locate, the bcv of each
+token).
+"""
+
+import argparse
+import sys
+import time
+
+from morphgnt import filesets, suffixes
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("query", nargs="+")
+argparser.add_argument("--fileset", default="sblgnt-lexemes")
+argparser.add_argument("--variant", default="norm", choices=sorted(suffixes.VARIANTS))
+argparser.add_argument("--start", action="store_true", help="only forms beginning with the query")
+argparser.add_argument("--end", action="store_true", help="only forms ending with the query")
+argparser.add_argument("--locate", action="store_true", help="print the bcv of each token")
+args = argparser.parse_args()
+
+start = time.time()
+fileset = filesets.load("filesets.yaml")[args.fileset]
+index = suffixes.load(fileset, args.variant)
+loaded = time.time()
+
+for query in args.query:
+    forms = index.types(query, args.start, args.end)
+    print("{}: {} tokens, {} forms".format(query, index.count(query, args.start, args.end), len(forms)))
+    if args.locate:
+        bcv = fileset.table()["bcv"]
+        norm = fileset.table()["norm"]
+        for position in index.locate(query, args.start, args.end):
+            print("    {} {}".format(bcv[position], norm[position]))
+    else:
+        for form in sorted(forms, key=lambda form: -index.concordance.count(form)):
+            print("    {} {}".format(form, index.concordance.count(form)))
+
+print("loaded in {:.0f}ms, searched in {:.0f}ms".format((loaded - start) * 1000, (time.time() - loaded) * 1000), file=sys.stderr)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""
+search the glosses and dictionary entries of lexemes.yaml.
+
+e.g. search_glosses.py servant
+     search_glosses.py --or slave servant
+     search_glosses.py "serv*"
+"""
+
+import argparse
+import sys
+import time
+
+from morphgnt.glosses import gloss_index
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("terms", nargs="+")
+argparser.add_argument("--or", dest="mode", action="store_const", const="or", default="and")
+argparser.add_argument("--lexemes", default="lexemes.yaml")
+argparser.add_argument("--limit", type=int, default=20)
+args = argparser.parse_args()
+
+index = gloss_index(args.lexemes)
+
+start = time.time()
+results = index.search(" ".join(args.terms), args.mode)
+elapsed = time.time() - start
+
+for headword, score in results[:args.limit]:
+    print("{} {:.2f} {}".format(headword, score, index.texts[headword].replace("\n", " | ")))
+
+print("{} results in {:.1f}ms".format(len(results), elapsed * 1000), file=sys.stderr)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+suggest near-miss spellings for each word in a word set (e.g.
+missing_bdag.txt) from another list of headwords.
+
+The headwords are the keys of a YAML file (default lexemes.yaml) or the
+first |- or tab-separated field of each line of a text file.
+"""
+
+import argparse
+import sys
+import time
+
+from morphgnt.fuzzy import TrigramIndex
+from morphgnt.utils import load_wordset, load_yaml
+
+
+def load_headwords(filename):
+    if filename.endswith(".yaml"):
+        return load_yaml(filename).keys()
+    with open(filename) as f:
+        return [
+            line.split("|")[0].split("\t")[0].strip()
+            for line in f.read().splitlines() if line.strip()
+        ]
+
+
+argparser = argparse.ArgumentParser()
+argparser.add_argument("wordset", help="word set file")
+argparser.add_argument("headwords", nargs="?", default="lexemes.yaml")
+argparser.add_argument("-k", type=int, default=3)
+argparser.add_argument("--min-score", type=float, default=0.0)
+args = argparser.parse_args()
+
+index = TrigramIndex(load_headwords(args.headwords))
+words = sorted(load_wordset(args.wordset))
+
+start = time.time()
+results = index.search_batch(words, args.k)
+elapsed = time.time() - start
+
+for word in words:
+    print("{}: {}".format(word, ", ".join(
+        "{} ({:.2f})".format(headword, score)
+        for headword, score in results[word] if score >= args.min_score
+    )))
+
+print("{} words in {:.3f}s".format(len(words), elapsed), file=sys.stderr)